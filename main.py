@@ -1,86 +1,215 @@
+import os
 import sys
+import time
 import pygame
+from sudoku_board import DIGIT_SYMBOLS
 from sudoku_gui import SudokuUI
+from sudoku_instruments import instruments
 
+FPS = 60
 
-def run(sudoku_ui):
-    """Main game loop for event handling."""
-    running = True
-    showing_menu = True
+# Events that can change what is on screen; anything else (e.g. mouse motion) is ignored
+REDRAW_EVENTS = (pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
+# Events after which the window's contents may be gone, so the whole frame is pushed again
+EXPOSE_EVENTS = (pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED)
 
-    while running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
 
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if pygame.mouse.get_pressed()[0]:
-                    mouse_cor = pygame.mouse.get_pos()
+def wait_for_events(sudoku_ui, showing_menu):
+    """Blocks until an event arrives or the game clock is due to tick over, then drains the queue"""
+    if showing_menu or sudoku_ui.game_end:
+        timeout = 1000
+    elif sudoku_ui.solving:
+        timeout = max(1, sudoku_ui.ms_until_solve_step())
+    else:
+        timeout = 1000 - sudoku_ui.elapsed_ms() % 1000
 
-                    if showing_menu:
-                        if sudoku_ui.difficulty_selected(mouse_cor):
-                            showing_menu = False
-                            sudoku_ui.start_new_game(sudoku_ui.difficulty)
+    event = pygame.event.wait(timeout)
+    events = [] if event.type == pygame.NOEVENT else [event]
+    return events + pygame.event.get()
 
-                    else:
-                        # Handle events while game is in progress
-                        if sudoku_ui.new_game_clicked(mouse_cor):
-                            showing_menu = True
 
-                        else:
-                            sudoku_ui.selected_cell = sudoku_ui.get_clicked_cell(
-                                mouse_cor
-                            )
+def handle_event(sudoku_ui, event, showing_menu):
+    """Applies one input event to the game. Returns whether the menu is showing afterwards"""
+    if event.type in REDRAW_EVENTS:
+        sudoku_ui.dirty = True
+    if event.type in EXPOSE_EVENTS:
+        sudoku_ui.full_redraw = True
 
-                            if sudoku_ui.highlighted_cell:
-                                row, col = sudoku_ui.highlighted_cell
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        if event.button == 1:
+            mouse_cor = event.pos
 
-                                # Get screen button clicks
+            if showing_menu:
+                if sudoku_ui.difficulty_selected(mouse_cor):
+                    showing_menu = False
+                    sudoku_ui.start_new_game(sudoku_ui.difficulty)
 
-                                num_clicked = sudoku_ui.num_button_clicked(mouse_cor)
-                                if num_clicked:
-                                    # Check if cell is modifiable: empty or contains notes
-                                    if sudoku_ui.grid[row][col] == 0 or isinstance(
-                                        sudoku_ui.grid[row][col], str
-                                    ):
-                                        sudoku_ui.handle_num_input(
-                                            row, col, num_clicked
-                                        )
+            else:
+                # Handle events while game is in progress
+                if sudoku_ui.new_game_clicked(mouse_cor):
+                    showing_menu = True
 
-                                sudoku_ui.del_button_clicked(row, col, mouse_cor)
+                elif not sudoku_ui.solving:
+                    sudoku_ui.selected_cell = sudoku_ui.get_clicked_cell(
+                        mouse_cor
+                    )
 
-                                sudoku_ui.notes_button_clicked(mouse_cor)
+                    if sudoku_ui.highlighted_cell:
+                        row, col = sudoku_ui.highlighted_cell
 
-                            sudoku_ui.solve_button_clicked(mouse_cor)
+                        # Get screen button clicks
 
-            elif event.type == pygame.KEYDOWN:
-                if sudoku_ui.highlighted_cell:
-                    row, col = sudoku_ui.highlighted_cell
-                    key = event.unicode
+                        num_clicked = sudoku_ui.num_button_clicked(mouse_cor)
+                        if num_clicked:
+                            # Check if cell is modifiable: empty or contains notes
+                            if sudoku_ui.can_enter(row, col):
+                                sudoku_ui.handle_num_input(
+                                    row, col, num_clicked
+                                )
 
-                    # Check if entered key is a valid digit and selected cell is empty / contains notes
-                    if (key.isdigit() and 1 <= int(key) <= 9) and (
-                        sudoku_ui.grid[row][col] == 0 or sudoku_ui.notes_mode
-                    ):
-                        sudoku_ui.handle_num_input(row, col, int(key))
+                        sudoku_ui.del_button_clicked(row, col, mouse_cor)
 
-                    # Delete entry
-                    elif event.key == pygame.K_BACKSPACE:
-                        if sudoku_ui.sudoku_board[row][col] == 0:
-                            sudoku_ui.grid[row][col] = 0
+                        sudoku_ui.notes_button_clicked(mouse_cor)
+
+                    sudoku_ui.auto_notes_clicked(mouse_cor)
+                    sudoku_ui.solve_button_clicked(mouse_cor)
+
+    elif event.type == pygame.KEYDOWN:
+        ctrl = event.mod & pygame.KMOD_CTRL
+
+        # F3 toggles the performance overlay
+        if event.key == pygame.K_F3:
+            sudoku_ui.toggle_overlay()
+
+        # Undo: Ctrl+Z, redo: Ctrl+Y or Ctrl+Shift+Z
+        elif not showing_menu and ctrl and event.key == pygame.K_z:
+            if event.mod & pygame.KMOD_SHIFT:
+                sudoku_ui.redo()
+            else:
+                sudoku_ui.undo()
+
+        elif not showing_menu and ctrl and event.key == pygame.K_y:
+            sudoku_ui.redo()
+
+        # Hint: H fills in the next logically deducible cell. Hints need a 9x9 board, and on
+        # 25x25 boards H is a digit
+        elif not showing_menu and event.key == pygame.K_h and sudoku_ui.size == 9:
+            sudoku_ui.show_hint()
+
+        elif sudoku_ui.highlighted_cell and not sudoku_ui.solving:
+            row, col = sudoku_ui.highlighted_cell
+            key = event.unicode
+
+            # Digits above 9 are typed as letters (A for 10)
+            digit = DIGIT_SYMBOLS.find(key.upper()) + 1 if len(key) == 1 else 0
+
+            # Check if entered key is a valid digit and selected cell is empty / contains notes
+            if 1 <= digit <= sudoku_ui.size and sudoku_ui.can_enter(row, col):
+                sudoku_ui.handle_num_input(row, col, digit)
+
+            # Delete entry
+            elif event.key == pygame.K_BACKSPACE:
+                sudoku_ui.clear_cell(row, col)
+
+    return showing_menu
+
+
+def draw_frame(sudoku_ui, showing_menu):
+    """Draws the menu or the board and pushes it to the display"""
+    if showing_menu:
+        sudoku_ui.game_menu()
+    elif not sudoku_ui.freeze_screen:
+        sudoku_ui.draw_grid(sudoku_ui.board)
+
+    sudoku_ui.present()
+    sudoku_ui.dirty = False
+    sudoku_ui.frame_stats['rendered'] += 1
 
-        # Display Game menu / Sudoku Board
-        if showing_menu:
-            sudoku_ui.game_menu()
-        elif not sudoku_ui.freeze_screen:
-            sudoku_ui.draw_grid(sudoku_ui.grid)
 
-        pygame.display.flip()
+def run(sudoku_ui, fps=FPS, recorder=None):
+    """Main game loop for event handling.
 
+    Frames are only drawn when marked dirty by input, a clock second rollover or a state change,
+    and at most fps times per second; an idle board sleeps in pygame.event.wait. A running
+    auto-solve is advanced one step per pass. A recorder (see sudoku_replay) receives every
+    event and the puzzle of every game started.
+    """
+    running = True
+    showing_menu = sudoku_ui.board is None  # A resumed game skips the menu
+    shown_second = None
+    frame_events = 0  # Events handled since the last rendered frame
+
+    if recorder and not showing_menu:
+        recorder.record_game(sudoku_ui.session, resumed=True)
+
+    while running:
+        events = pygame.event.get() if sudoku_ui.dirty else wait_for_events(sudoku_ui, showing_menu)
+        frame_events += len(events)
+
+        for event in events:
+            if recorder:
+                recorder.record(event)
+
+            if event.type == pygame.QUIT:
+                running = False
+                continue
+
+            was_showing_menu = showing_menu
+            showing_menu = handle_event(sudoku_ui, event, showing_menu)
+            if recorder and was_showing_menu and not showing_menu:
+                recorder.record_game(sudoku_ui.session)
+
+        if not showing_menu:
+            sudoku_ui.step_auto_solve()
+            sudoku_ui.autosave()
+
+            # Redraw when the displayed clock second changes
+            second = sudoku_ui.elapsed_ms() // 1000
+            if second != shown_second:
+                shown_second = second
+                sudoku_ui.dirty = True
+
+        if not sudoku_ui.dirty:
+            sudoku_ui.frame_stats['skipped'] += 1
+            continue
+
+        frame_start = instruments.enabled and time.perf_counter()
+
+        # Display Game menu / Sudoku Board
+        draw_frame(sudoku_ui, showing_menu)
+
+        if frame_start:
+            instruments.record("frame", (time.perf_counter() - frame_start) * 1000)
+            instruments.record("events_per_frame", frame_events)
+            instruments.count("events", frame_events)
+        frame_events = 0
+        sudoku_ui.clock.tick(fps)
+
+    sudoku_ui.close_autosave()
+    sudoku_ui.puzzle_pool.close()
+    if sudoku_ui.puzzle_bank:
+        sudoku_ui.puzzle_bank.close()
+    if recorder:
+        recorder.close()
+
+    trace_path = os.environ.get("SUDOKU_TRACE")
+    if trace_path:
+        instruments.dump(trace_path)
     pygame.quit()
     sys.exit()
 
 
 if __name__ == "__main__":
-    game_ui = SudokuUI()
-    run(game_ui)
+    if os.environ.get("SUDOKU_TRACE"):
+        instruments.enable(trace=True)
+
+    game_ui = SudokuUI(daily=bool(os.environ.get("SUDOKU_DAILY")), size=int(os.environ.get("SUDOKU_SIZE", 9)))
+    game_ui.resume_saved_game()
+
+    record_path = os.environ.get("SUDOKU_RECORD")
+    if record_path:
+        from sudoku_replay import EventRecorder
+
+        run(game_ui, recorder=EventRecorder(record_path))
+    else:
+        run(game_ui)
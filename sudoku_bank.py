@@ -0,0 +1,156 @@
+"""Compact binary puzzle bank with memory-mapped, constant-time access by index
+
+File layout (little-endian):
+    header      magic b"SDKB", version u16, record size u16, record count u32,
+                index offset u64, then one u32 record count per difficulty
+    records     fixed-size: givens and solution packed at 4 bits per cell
+                (41 bytes each), followed by a u8 difficulty code
+    index       per difficulty, in DIFFICULTIES order, the u32 record numbers
+                of every puzzle of that difficulty
+"""
+import mmap
+import random
+import struct
+from array import array
+
+DIFFICULTIES = ("Easy", "Medium", "Expert")
+
+MAGIC = b"SDKB"
+VERSION = 1
+HEADER = struct.Struct("<4sHHIQ" + "I" * len(DIFFICULTIES))
+PACKED_GRID_SIZE = 41  # 81 cells at 4 bits each, rounded up to whole bytes
+RECORD_SIZE = 2 * PACKED_GRID_SIZE + 1
+
+
+def pack_cells(cells):
+    """Packs 81 cell values (a flat sequence of ints or a digit string) into 41 bytes"""
+    values = [int(value) for value in cells]
+    values.append(0)  # Pad to an even number of nibbles
+    return bytes((values[i] << 4) | values[i + 1] for i in range(0, 82, 2))
+
+
+def unpack_grid(data):
+    """Unpacks 41 bytes into a 9x9 grid"""
+    cells = []
+    for byte in data:
+        cells.append(byte >> 4)
+        cells.append(byte & 0x0F)
+    return [cells[row * 9:row * 9 + 9] for row in range(9)]
+
+
+class PuzzleBankWriter:
+    """Streams puzzles into a bank file, writing the difficulty index when closed"""
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.count = 0
+        self.index = {difficulty: array("I") for difficulty in DIFFICULTIES}
+
+        # Reserve room for the header; it is rewritten once the counts are known
+        self.file.write(bytes(HEADER.size))
+
+    def add(self, puzzle, solution, difficulty):
+        """Appends a record; puzzle and solution are 81 flat cells or 81-digit strings"""
+        code = DIFFICULTIES.index(difficulty)
+        self.file.write(pack_cells(puzzle) + pack_cells(solution) + bytes((code,)))
+        self.index[difficulty].append(self.count)
+        self.count += 1
+
+    def close(self):
+        if self.file.closed:
+            return
+
+        index_offset = self.file.tell()
+        for difficulty in DIFFICULTIES:
+            self.index[difficulty].tofile(self.file)
+
+        counts = [len(self.index[difficulty]) for difficulty in DIFFICULTIES]
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, RECORD_SIZE, self.count, index_offset, *counts))
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class PuzzleBank:
+    """Read-only view of a bank file; records are decoded straight from the memory map"""
+
+    def __init__(self, path):
+        """Maps a bank file; raises ValueError if it is not a complete bank, OSError if unreadable"""
+        with open(path, "rb") as file:
+            # mmap refuses empty files with ValueError, like any other short file below
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self.map) < HEADER.size:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank")
+
+        magic, version, record_size, count, index_offset, *counts = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION or record_size != RECORD_SIZE:
+            self.map.close()
+            raise ValueError(f"{path} is not a version {VERSION} puzzle bank")
+
+        # A truncated or padded file would otherwise map records or index entries out of bounds
+        if (index_offset != HEADER.size + count * RECORD_SIZE or sum(counts) != count
+                or len(self.map) != index_offset + 4 * count):
+            self.map.close()
+            raise ValueError(f"{path} is truncated or corrupt")
+
+        self.length = count
+
+        # Byte offset of each difficulty's slice of the index
+        self.index_ranges = {}
+        offset = index_offset
+        for difficulty, difficulty_count in zip(DIFFICULTIES, counts):
+            self.index_ranges[difficulty] = (offset, difficulty_count)
+            offset += 4 * difficulty_count
+
+    def __len__(self):
+        return self.length
+
+    def count(self, difficulty):
+        """Returns the number of puzzles stored for a difficulty"""
+        return self.index_ranges.get(difficulty, (0, 0))[1]
+
+    def get(self, index):
+        """Returns (puzzle, solution, difficulty) for the record at the given index"""
+        if not 0 <= index < self.length:
+            raise IndexError(f"puzzle index {index} out of range")
+
+        start = HEADER.size + index * RECORD_SIZE
+        record = self.map[start:start + RECORD_SIZE]
+
+        puzzle = unpack_grid(record[:PACKED_GRID_SIZE])
+        solution = unpack_grid(record[PACKED_GRID_SIZE:2 * PACKED_GRID_SIZE])
+        return puzzle, solution, DIFFICULTIES[record[-1]]
+
+    def get_by_difficulty(self, difficulty, position):
+        """Returns the position-th puzzle of a difficulty as (puzzle, solution, difficulty)"""
+        offset, difficulty_count = self.index_ranges[difficulty]
+        if not 0 <= position < difficulty_count:
+            raise IndexError(f"{difficulty} position {position} out of range")
+
+        (index,) = struct.unpack_from("<I", self.map, offset + 4 * position)
+        return self.get(index)
+
+    def random_puzzle(self, difficulty, rng=random):
+        """Returns a random (puzzle, solution) pair of the difficulty, or None if there are none"""
+        difficulty_count = self.count(difficulty)
+        if not difficulty_count:
+            return None
+
+        puzzle, solution, _ = self.get_by_difficulty(difficulty, rng.randrange(difficulty_count))
+        return puzzle, solution
+
+    def close(self):
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
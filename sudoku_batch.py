@@ -0,0 +1,148 @@
+"""Headless batch puzzle generation across a process pool; never imports pygame
+
+Usage: python -m sudoku_game_logic generate --difficulty Expert --count 1000 --workers 4
+       python -m sudoku_game_logic generate --difficulty Easy Medium Expert --format bank --output puzzles.bank
+       python -m sudoku_game_logic validate puzzles.bank   (needs NumPy)
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from sudoku_bank import PuzzleBank, PuzzleBankWriter
+from sudoku_game_logic import SudokuGame
+
+DIFFICULTIES = ("Easy", "Medium", "Expert")
+
+
+def grid_to_line(grid):
+    """Flattens a 9x9 grid into an 81-character digit string, 0 marking empty cells"""
+    return "".join(str(value) for row in grid for value in row)
+
+
+def generate_chunk(task):
+    """Generates one chunk of puzzles from its own seed as (puzzle, solution) digit strings
+
+    Every chunk draws from its own random.Random seeded with the base seed, the difficulty
+    and the chunk number, so the output only depends on those and the chunk size, not on
+    which worker ran the chunk or in which order chunks finished. Difficulties generated
+    from one base seed never share a stream.
+    """
+    difficulty, seed, chunk_index, size = task
+    rng = random.Random(f"{seed}/{difficulty}/{chunk_index}")
+
+    pairs = []
+    for _ in range(size):
+        game = SudokuGame(rng=rng)
+        puzzle = game.generate_puzzle(difficulty)
+        pairs.append((grid_to_line(puzzle), grid_to_line(game.solutions[0])))
+
+    return pairs
+
+
+def generate_batch(difficulty, count, write, workers=None, seed=0, chunk_size=50, report_every=2.0):
+    """Generates count puzzles and passes each (puzzle, solution) pair to write in seed order
+
+    Returns the number of puzzles written.
+    """
+    tasks = []
+    for chunk_index, start in enumerate(range(0, count, chunk_size)):
+        tasks.append((difficulty, seed, chunk_index, min(chunk_size, count - start)))
+
+    written = 0
+    start_time = last_report = time.perf_counter()
+
+    with multiprocessing.Pool(workers or os.cpu_count()) as pool:
+        # imap keeps chunk order, so a given seed always produces the same file
+        for pairs in pool.imap(generate_chunk, tasks):
+            for puzzle, solution in pairs:
+                write(puzzle, solution)
+            written += len(pairs)
+
+            now = time.perf_counter()
+            if now - last_report >= report_every or written == count:
+                rate = written / (now - start_time)
+                print(f"{written}/{count} puzzles ({rate:.1f} puzzles/sec)", file=sys.stderr)
+                last_report = now
+
+    return written
+
+
+def validate_bank(path, chunk_size=4096):
+    """Re-solves every puzzle of a bank in vectorized batches
+
+    Returns the record numbers whose puzzle is not unique or whose stored solution differs.
+    """
+    import numpy as np
+
+    from sudoku_vector_solver import solve_batch
+
+    failures = []
+    with PuzzleBank(path) as bank:
+        for start in range(0, len(bank), chunk_size):
+            records = [bank.get(index) for index in range(start, min(start + chunk_size, len(bank)))]
+            puzzles = np.array([puzzle for puzzle, _, _ in records], dtype=np.uint8)
+            expected = np.array([solution for _, solution, _ in records], dtype=np.uint8)
+
+            solutions, unique = solve_batch(puzzles)
+            bad = ~unique | (solutions != expected).any(axis=(1, 2))
+            failures.extend(start + int(offset) for offset in np.flatnonzero(bad))
+
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m sudoku_game_logic")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    generate = commands.add_parser("generate", help="generate puzzles in bulk")
+    generate.add_argument("--difficulty", choices=DIFFICULTIES, nargs="+", default=["Medium"])
+    generate.add_argument("--count", type=int, default=100, help="puzzles per difficulty")
+    generate.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    generate.add_argument("--seed", type=int, default=0, help="base seed; each chunk of each difficulty gets its own stream")
+    generate.add_argument("--chunk-size", type=int, default=50, help="puzzles per worker task")
+    generate.add_argument("--output", default="-", help="output file ('-' for stdout in text format)")
+    generate.add_argument("--format", choices=("text", "bank"), default="text",
+                          help="'puzzle solution' lines, or a binary puzzle bank (see sudoku_bank)")
+
+    validate = commands.add_parser("validate", help="check every puzzle of a bank is unique and matches its solution")
+    validate.add_argument("bank", help="puzzle bank file (see sudoku_bank)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "validate":
+        start = time.perf_counter()
+        failures = validate_bank(args.bank)
+        elapsed = time.perf_counter() - start
+
+        for index in failures:
+            print(f"record {index}: not unique or solution mismatch")
+        print(f"Validated {args.bank} in {elapsed:.2f}s, {len(failures)} failures", file=sys.stderr)
+        sys.exit(1 if failures else 0)
+
+    if args.command == "generate":
+        if args.format == "bank":
+            if args.output == "-":
+                parser.error("--format bank needs an --output file")
+            sink = PuzzleBankWriter(args.output)
+        else:
+            sink = sys.stdout if args.output == "-" else open(args.output, "w")
+
+        try:
+            for difficulty in args.difficulty:
+                if args.format == "bank":
+                    write = lambda puzzle, solution: sink.add(puzzle, solution, difficulty)
+                else:
+                    write = lambda puzzle, solution: sink.write(f"{puzzle} {solution}\n")
+
+                start = time.perf_counter()
+                written = generate_batch(difficulty, args.count, write, args.workers, args.seed, args.chunk_size)
+                elapsed = time.perf_counter() - start
+
+                print(f"Generated {written} {difficulty} puzzles in {elapsed:.2f}s "
+                      f"({written / elapsed:.1f} puzzles/sec)", file=sys.stderr)
+        finally:
+            if sink is not sys.stdout:
+                sink.close()
@@ -0,0 +1,291 @@
+"""Compares puzzle generation and solving between the bitmask engine and the original backtracker
+
+Usage: python sudoku_benchmark.py [--rounds N] [--seed S]
+       python sudoku_benchmark.py --gate benchmarks.json [--threshold 0.25] [--save]
+
+With --gate, fixed-seed corpora are timed through generation, solving, the uniqueness check,
+is_valid_move and headless draw_grid frames, and compared with a JSON baseline. The run exits
+with status 1 if any metric is slower than its baseline by more than the threshold. A missing
+baseline, or --save, records the current timings instead.
+tests/bench_sudoku.py runs the same corpora under pytest-benchmark.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import time
+
+from sudoku_game_logic import SudokuGame
+
+DIFFICULTIES = ("Easy", "Medium", "Expert")
+
+
+class LegacySudokuGame(SudokuGame):
+    """The original list-scanning backtracker, kept only as a benchmark reference"""
+
+    @staticmethod
+    def get_num_cells_to_remove(difficulty):
+        return {"Easy": 35, "Medium": 45, "Expert": 54}.get(difficulty)
+
+    def generate_puzzle(self, difficulty):
+        self.generate_complete_grid()
+
+        num_cells_to_remove = self.get_num_cells_to_remove(difficulty)
+        cells_to_remove = random.sample(range(81), num_cells_to_remove)
+
+        for cell_index in cells_to_remove:
+            row = cell_index // 9
+            col = cell_index % 9
+
+            removed_cell = self.grid[row][col]
+            self.grid[row][col] = 0
+
+            grid_copy = [row[:] for row in self.grid]
+            self.is_unique = True
+
+            if self.solve_sudoku(grid_copy):
+                if not self.is_unique:
+                    self.grid[row][col] = removed_cell
+                    self.solutions.pop()
+
+        return self.grid
+
+    def generate_complete_grid(self):
+        def solve(grid, row, col):
+            if row == 9:
+                return True
+
+            next_row = row + 1 if col == 8 else row
+            next_col = (col + 1) % 9
+
+            for num in range(1, 10):
+                if self.is_valid_move(grid, row, col, num):
+                    grid[row][col] = num
+
+                    if solve(grid, next_row, next_col):
+                        return True
+
+            grid[row][col] = 0
+
+            return False
+
+        self.grid[0] = random.sample(range(1, 10), 9)
+        solve(self.grid, 1, 0)
+
+    def solve_sudoku(self, grid):
+        grid = grid or self.grid
+
+        empty_cell = self.find_empty_cell(grid)
+
+        if not empty_cell:
+            if grid not in self.solutions:
+                self.solutions.append(grid)
+
+            if len(self.solutions) > 1:
+                self.is_unique = False
+
+            return True
+
+        row, col = empty_cell
+
+        for num in range(1, 10):
+            if self.is_valid_move(grid, row, col, num):
+                grid[row][col] = num
+
+                if self.solve_sudoku(grid):
+                    return True
+
+        grid[row][col] = 0
+
+        return False
+
+
+def time_generation(game_class, difficulty, rounds, seed):
+    """Returns mean seconds per generate_puzzle call and the generated puzzles"""
+    random.seed(seed)
+    puzzles = []
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        puzzles.append(game_class().generate_puzzle(difficulty))
+    elapsed = time.perf_counter() - start
+
+    return elapsed / rounds, puzzles
+
+
+def time_solving(game_class, puzzles):
+    """Returns mean seconds per solve_sudoku call over copies of the given puzzles"""
+    start = time.perf_counter()
+    for puzzle in puzzles:
+        game_class().solve_sudoku([row[:] for row in puzzle])
+    elapsed = time.perf_counter() - start
+
+    return elapsed / len(puzzles)
+
+
+def best_of(repeat, run):
+    """Returns the fastest of repeat calls to run, each returning its own mean seconds per item"""
+    return min(run() for _ in range(repeat))
+
+
+def time_calls(func, args_list):
+    """Returns mean seconds per call of func over a list of argument tuples"""
+    start = time.perf_counter()
+    for args in args_list:
+        func(*args)
+    return (time.perf_counter() - start) / len(args_list)
+
+
+def corpus_digest(corpora):
+    """Fingerprint of the generated corpora, so a baseline taken on other puzzles is flagged"""
+    text = "".join(str(value) for difficulty in DIFFICULTIES for puzzle in corpora[difficulty]
+                   for row in puzzle for value in row)
+    return hashlib.sha1(text.encode()).hexdigest()[:16]
+
+
+def time_rendering(puzzle, solution, frames):
+    """Returns mean seconds per draw_grid plus present for idle, edited and cold frames, headless"""
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+    from sudoku_gui import SudokuUI
+
+    ui = SudokuUI(pool_depth=0, bank_path=None, save_path=None)
+    ui.session.start("Medium", puzzle, solution)
+    ui.reset_view("Medium")
+    ui.selected_cell = (4, 4)
+    row, col = ui.board.first_open()
+
+    def frame():
+        ui.draw_grid(ui.board)
+        ui.present()
+
+    def idle():
+        return time_calls(frame, [()] * frames)
+
+    def edited():
+        def edit_frame():
+            ui.board.toggle_note(row, col, 5)
+            frame()
+        return time_calls(edit_frame, [()] * frames)
+
+    def cold():
+        def cold_frame():
+            ui.board_layer = None
+            frame()
+        return time_calls(cold_frame, [()] * frames)
+
+    frame()
+    results = {"draw_grid.idle": idle, "draw_grid.edit": edited, "draw_grid.cold": cold}
+    return results, ui
+
+
+def collect_metrics(rounds, seed, repeat=3, frames=200):
+    """Times every gated metric on fixed-seed corpora. Returns (metrics in ms, corpus digest)"""
+    metrics = {}
+    corpora = {}
+
+    for difficulty in DIFFICULTIES:
+        # Generation is seeded per run, so every repeat builds the same corpus
+        generation = []
+        for _ in range(repeat):
+            mean, corpora[difficulty] = time_generation(SudokuGame, difficulty, rounds, seed)
+            generation.append(mean)
+        metrics[f"generate.{difficulty}"] = min(generation)
+
+        puzzles = corpora[difficulty]
+        metrics[f"solve.{difficulty}"] = best_of(repeat, lambda: time_solving(SudokuGame, puzzles))
+        metrics[f"unique.{difficulty}"] = best_of(
+            repeat, lambda: time_calls(SudokuGame.count_solutions, [(puzzle,) for puzzle in puzzles])
+        )
+
+    moves = [(puzzle, row, col, num) for puzzle in corpora["Medium"]
+             for row in range(9) for col in range(9) for num in range(1, 10)]
+    metrics["is_valid_move"] = best_of(repeat, lambda: time_calls(SudokuGame.is_valid_move, moves))
+
+    random.seed(seed)
+    game = SudokuGame()
+    game.generate_puzzle("Medium")
+    renderers, ui = time_rendering(game.grid, game.solutions[0], frames)
+    try:
+        for name, run in renderers.items():
+            metrics[name] = best_of(repeat, run)
+    finally:
+        ui.puzzle_pool.close()
+
+    return {name: seconds * 1000 for name, seconds in metrics.items()}, corpus_digest(corpora)
+
+
+def gate(path, rounds, seed, threshold, save):
+    """Compares fresh metrics with the baseline at path. Returns the process exit status"""
+    metrics, digest = collect_metrics(rounds, seed)
+    baseline = None
+    if os.path.exists(path) and not save:
+        with open(path) as file:
+            baseline = json.load(file)
+
+    if baseline is None:
+        with open(path, "w") as file:
+            json.dump({"rounds": rounds, "seed": seed, "corpus": digest, "metrics": metrics}, file, indent=2)
+        for name, value in metrics.items():
+            print(f"{name:<18} {value:>11.4f} ms")
+        print(f"Baseline written to {path}")
+        return 0
+
+    if (baseline["rounds"], baseline["seed"], baseline["corpus"]) != (rounds, seed, digest):
+        print("Note: the corpus differs from the baseline's; timings are not like for like", file=sys.stderr)
+
+    regressions = []
+    print(f"{'metric':<18} {'baseline ms':>11} {'current ms':>11} {'change':>8}")
+    for name, value in metrics.items():
+        base = baseline["metrics"].get(name)
+        if base is None:
+            print(f"{name:<18} {'-':>11} {value:>11.4f}")
+            continue
+
+        change = value / base - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<18} {base:>11.4f} {value:>11.4f} {change:>+7.0%}{flag}")
+
+    if regressions:
+        print(f"{len(regressions)} metric(s) regressed past {threshold:.0%}: {', '.join(regressions)}",
+              file=sys.stderr)
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=5, help="puzzles per difficulty")
+    parser.add_argument("--seed", type=int, default=2024, help="random seed for both engines")
+    parser.add_argument("--gate", metavar="BASELINE", help="compare with a JSON baseline and fail on regressions")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown, as a fraction")
+    parser.add_argument("--save", action="store_true", help="overwrite the baseline with this run")
+    args = parser.parse_args(argv)
+
+    if args.gate:
+        sys.exit(gate(args.gate, args.rounds, args.seed, args.threshold, args.save))
+
+    print(f"{'difficulty':<10} {'task':<9} {'legacy ms':>11} {'engine ms':>11} {'speedup':>9}")
+
+    # The engine generates rated puzzles (see sudoku_rating), so its generate timings include
+    # rejection sampling for the difficulty band; the legacy generator only removes cells
+    for difficulty in DIFFICULTIES:
+        legacy_gen, _ = time_generation(LegacySudokuGame, difficulty, args.rounds, args.seed)
+        engine_gen, puzzles = time_generation(SudokuGame, difficulty, args.rounds, args.seed)
+
+        # Both solvers work on the same puzzles so the solve timings are comparable
+        legacy_solve = time_solving(LegacySudokuGame, puzzles)
+        engine_solve = time_solving(SudokuGame, puzzles)
+
+        for task, legacy, engine in (("generate", legacy_gen, engine_gen), ("solve", legacy_solve, engine_solve)):
+            print(f"{difficulty:<10} {task:<9} {legacy * 1000:>11.2f} {engine * 1000:>11.2f} "
+                  f"{legacy / engine:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
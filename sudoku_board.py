@@ -0,0 +1,290 @@
+"""Compact board model: flat value, notes and status planes, one entry per cell"""
+from array import array
+from collections import deque
+
+from sudoku_solver import geometry
+
+# Cell status plane
+EMPTY = 0  # No digit; the cell may hold notes
+GIVEN = 1  # Part of the puzzle
+CORRECT = 2  # Entered by the player and matching the solution
+WRONG = 3  # Entered by the player and not matching the solution
+
+# Digits shown on boards larger than 9x9 continue with letters, one character per digit
+DIGIT_SYMBOLS = "123456789ABCDEFGHIJKLMNOP"
+
+
+def notes_typecode(size):
+    """Array typecode wide enough for a note bit per digit: uint16 up to 16x16, uint32 beyond"""
+    return "H" if size <= 16 else "I"
+
+
+class Board:
+    """Values in a bytearray, notes as a bitmask per cell and a status byte per cell
+
+    Boards are 9x9 unless given another size from sudoku_solver.SIZES. Cells are addressed by
+    (row, col); the planes are indexed by row * size + col. Filled cells
+    (given or correct) are counted per row, column, box and digit, and wrong entries are
+    counted too, all updated on every write so win and progress checks are O(1). The filled
+    digits of each unit are also kept as bitmasks, which makes candidates a three-lookup query.
+    """
+
+    __slots__ = ("size", "shape", "values", "notes", "status", "filled", "wrong_count",
+                 "row_filled", "col_filled", "box_filled", "digit_counts",
+                 "row_mask", "col_mask", "box_mask", "journal")
+
+    def __init__(self, values=None, notes=None, status=None, size=9):
+        self.size = size
+        self.shape = geometry(size)
+        cells = self.shape.cells
+        self.values = values if values is not None else bytearray(cells)
+        self.notes = notes if notes is not None else array(notes_typecode(size), [0]) * cells
+        self.status = status if status is not None else bytearray(cells)
+        self.journal = None
+        self.recount()
+
+    def recount(self):
+        """Rebuilds every counter from the planes"""
+        size = self.size
+        self.filled = self.wrong_count = 0
+        self.row_filled = [0] * size
+        self.col_filled = [0] * size
+        self.box_filled = [0] * size
+        self.digit_counts = [0] * (size + 1)
+        self.row_mask = [0] * size
+        self.col_mask = [0] * size
+        self.box_mask = [0] * size
+
+        for index, status in enumerate(self.status):
+            self._count(index, self.values[index], status, 1)
+
+    def _count(self, index, value, status, delta):
+        if status == GIVEN or status == CORRECT:
+            shape = self.shape
+            row, col, box = shape.row_of[index], shape.col_of[index], shape.box_of[index]
+            self.filled += delta
+            self.row_filled[row] += delta
+            self.col_filled[col] += delta
+            self.box_filled[box] += delta
+            self.digit_counts[value] += delta
+
+            # Filled digits never repeat within a unit, so toggling the bit adds or removes it
+            bit = 1 << (value - 1)
+            self.row_mask[row] ^= bit
+            self.col_mask[col] ^= bit
+            self.box_mask[box] ^= bit
+        elif status == WRONG:
+            self.wrong_count += delta
+
+    def _remember(self, index):
+        """Records a cell's state before its first change while a journal is open"""
+        if self.journal is not None and index not in self.journal:
+            self.journal[index] = self.cell_state(index)
+
+    def _write(self, index, value, status):
+        """Changes a cell's digit and status, keeping the counters in step"""
+        self._remember(index)
+        self._count(index, self.values[index], self.status[index], -1)
+        self.values[index] = value
+        self.status[index] = status
+        self._count(index, value, status, 1)
+
+    def _set_notes(self, index, notes):
+        self._remember(index)
+        self.notes[index] = notes
+
+    @property
+    def remaining(self):
+        """Number of cells still lacking a given or correct digit"""
+        return self.shape.cells - self.filled
+
+    def is_complete(self):
+        """True once every cell holds a given or correct digit"""
+        return self.filled == self.shape.cells
+
+    def completed_units(self, row, col):
+        """Returns whether the cell's row, column and box are each completely filled"""
+        size = self.size
+        box = self.shape.box_of[row * size + col]
+        return self.row_filled[row] == size, self.col_filled[col] == size, self.box_filled[box] == size
+
+    def digit_complete(self, digit):
+        """True when every copy of a digit (nine on a 9x9 board) is placed correctly"""
+        return self.digit_counts[digit] == self.size
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Builds a board from a square puzzle grid; its non-zero cells become givens"""
+        values = bytearray(value for row in grid for value in row)
+        status = bytearray(GIVEN if value else EMPTY for value in values)
+        return cls(values, None, status, len(grid))
+
+    def copy(self):
+        """Returns an independent snapshot: flat buffer copies plus the counters, no recount"""
+        board = Board.__new__(Board)
+        board.size = self.size
+        board.shape = self.shape
+        board.values = self.values[:]
+        board.notes = self.notes[:]
+        board.status = self.status[:]
+        board.filled = self.filled
+        board.wrong_count = self.wrong_count
+        board.row_filled = self.row_filled[:]
+        board.col_filled = self.col_filled[:]
+        board.box_filled = self.box_filled[:]
+        board.digit_counts = self.digit_counts[:]
+        board.row_mask = self.row_mask[:]
+        board.col_mask = self.col_mask[:]
+        board.box_mask = self.box_mask[:]
+        board.journal = None
+        return board
+
+    def value(self, row, col):
+        return self.values[row * self.size + col]
+
+    def cell_status(self, row, col):
+        return self.status[row * self.size + col]
+
+    def cell_notes(self, row, col):
+        return self.notes[row * self.size + col]
+
+    def is_given(self, row, col):
+        return self.status[row * self.size + col] == GIVEN
+
+    def candidates(self, index):
+        """Returns the bitmask of digits not yet filled in the cell's row, column or box"""
+        shape = self.shape
+        return shape.full_mask & ~(
+            self.row_mask[shape.row_of[index]] | self.col_mask[shape.col_of[index]]
+            | self.box_mask[shape.box_of[index]]
+        )
+
+    def place(self, row, col, digit, correct):
+        """Writes a player digit, replacing any notes in the cell
+
+        A correct digit is also removed from the notes of the cell's peers (20 on a 9x9 board).
+        """
+        index = row * self.size + col
+        self._write(index, digit, CORRECT if correct else WRONG)
+        self._set_notes(index, 0)
+
+        if correct:
+            self.eliminate_note(index, digit)
+
+    def eliminate_note(self, index, digit):
+        """Clears one note digit from the peers of a cell"""
+        bit = 1 << (digit - 1)
+        notes = self.notes
+        for peer in self.shape.peers[index]:
+            if notes[peer] & bit:
+                self._set_notes(peer, notes[peer] & ~bit)
+
+    def fill_candidates(self):
+        """Sets the notes of every empty cell to its legal candidates"""
+        for index, status in enumerate(self.status):
+            if status == EMPTY:
+                mask = self.candidates(index)
+                if self.notes[index] != mask:
+                    self._set_notes(index, mask)
+
+    def clear(self, row, col):
+        """Empties a non-given cell, dropping its digit and notes"""
+        index = row * self.size + col
+        if self.status[index] != GIVEN:
+            self._write(index, 0, EMPTY)
+            self._set_notes(index, 0)
+
+    def toggle_note(self, row, col, digit):
+        """Adds or removes a note digit; a wrong entry in the cell is replaced by the note"""
+        index = row * self.size + col
+        if self.status[index] == WRONG:
+            self._write(index, 0, EMPTY)
+        self._set_notes(index, self.notes[index] ^ (1 << (digit - 1)))
+
+    def cell_state(self, index):
+        """Returns (value, status, notes) of a cell, the unit of undo history"""
+        return self.values[index], self.status[index], self.notes[index]
+
+    def restore_cell(self, index, state):
+        value, status, notes = state
+        self._write(index, value, status)
+        self._set_notes(index, notes)
+
+    def note_digits(self, row, col):
+        """Returns the note digits of a cell in ascending order"""
+        mask = self.notes[row * self.size + col]
+        return [digit for digit in range(1, self.size + 1) if mask & (1 << (digit - 1))]
+
+    def filled_values(self):
+        """Returns the given and correct digits as one byte per cell, 0 for every other cell"""
+        return bytes(
+            value if status == GIVEN or status == CORRECT else 0
+            for value, status in zip(self.values, self.status)
+        )
+
+    def first_open(self):
+        """Returns (row, col) of the first cell without a given or correct digit, or None"""
+        found = [index for index in (self.status.find(EMPTY), self.status.find(WRONG)) if index >= 0]
+        return divmod(min(found), self.size) if found else None
+
+    def to_grid(self):
+        """Returns the digits as a list of rows, with 0 for empty cells"""
+        values, size = self.values, self.size
+        return [list(values[row * size:row * size + size]) for row in range(size)]
+
+
+class History:
+    """Bounded undo/redo stacks of cell deltas
+
+    Each entry is a tuple of (index, before, after) cell states from Board.cell_state, one per
+    cell the move touched: usually one, plus any peers whose notes lost the placed digit, or
+    every empty cell for a fill-candidates move. Nothing proportional to the board is stored,
+    and the oldest moves fall off once depth is reached.
+    """
+
+    def __init__(self, depth=500):
+        self.undo_stack = deque(maxlen=depth)
+        self.redo_stack = []
+
+    def apply(self, board, operation, *args):
+        """Runs a Board operation and records the cells it changed as one move"""
+        board.journal = {}
+        try:
+            operation(*args)
+        finally:
+            journal, board.journal = board.journal, None
+
+        move = tuple(
+            (index, before, board.cell_state(index))
+            for index, before in journal.items()
+            if board.cell_state(index) != before
+        )
+        if move:
+            self.undo_stack.append(move)
+            self.redo_stack.clear()
+
+    def undo(self, board):
+        """Reverts the last move. Returns the (row, col) of its first cell, or None if there is none"""
+        if not self.undo_stack:
+            return None
+
+        move = self.undo_stack.pop()
+        for index, before, _ in reversed(move):
+            board.restore_cell(index, before)
+        self.redo_stack.append(move)
+        return divmod(move[0][0], board.size)
+
+    def redo(self, board):
+        """Re-applies the last undone move. Returns the (row, col) of its first cell, or None"""
+        if not self.redo_stack:
+            return None
+
+        move = self.redo_stack.pop()
+        for index, _, after in move:
+            board.restore_cell(index, after)
+        self.undo_stack.append(move)
+        return divmod(move[0][0], board.size)
+
+    def clear(self):
+        self.undo_stack.clear()
+        self.redo_stack.clear()
@@ -0,0 +1,118 @@
+"""Seeded and daily puzzles: generated deterministically from a seed, then cached on disk
+
+Usage: python sudoku_daily.py [--date YYYY-MM-DD | --seed S] [--cache DIR]   (prints the puzzles)
+
+A (seed, difficulty) pair always yields the same puzzle: generation runs in search mode on a
+random.Random seeded with both. Each generated puzzle is written to the cache directory, one
+small file per key laid out like a bank record (see sudoku_bank) with a CRC-32 trailer, so
+later launches, and any machine given the same directory, load it instead of generating it.
+"""
+import argparse
+import datetime
+import hashlib
+import os
+import random
+import zlib
+
+from sudoku_bank import DIFFICULTIES, PACKED_GRID_SIZE, pack_cells, unpack_grid
+from sudoku_game_logic import SudokuGame
+from sudoku_save import CHECKSUM, write_atomic
+
+# Beside this module rather than in the working directory, so every launch shares one cache
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "puzzle_cache")
+CACHE_RECORD_SIZE = 2 * PACKED_GRID_SIZE + 1 + CHECKSUM.size
+
+
+def daily_seed(date=None):
+    """Returns the seed of a day's puzzles, today's in UTC by default, so every clock agrees"""
+    date = date or datetime.datetime.now(datetime.timezone.utc).date()
+    return f"daily-{date.isoformat()}"
+
+
+def seeded_rng(seed, difficulty):
+    """Returns a random.Random for a (seed, difficulty) pair
+
+    String seeds are hashed with SHA-512 by random.seed, so the stream does not depend on
+    PYTHONHASHSEED or the platform.
+    """
+    return random.Random(f"{seed}/{difficulty}")
+
+
+def generate_seeded(seed, difficulty):
+    """Generates the (puzzle, solution) of a (seed, difficulty) pair, without the cache"""
+    game = SudokuGame(rng=seeded_rng(seed, difficulty))
+    game.generate_puzzle(difficulty)
+    return game.grid, game.solutions[0]
+
+
+class PuzzleCache:
+    """Seeded puzzles on disk, generated on first use"""
+
+    def __init__(self, directory=CACHE_DIR):
+        self.directory = directory
+
+    def path(self, seed, difficulty):
+        key = hashlib.sha256(f"{seed}/{difficulty}".encode()).hexdigest()[:20]
+        return os.path.join(self.directory, f"{difficulty.lower()}-{key}.sdkp")
+
+    def load(self, seed, difficulty):
+        """Returns the cached (puzzle, solution) of a key, or None if it is missing or corrupt"""
+        try:
+            with open(self.path(seed, difficulty), "rb") as file:
+                data = file.read()
+        except OSError:
+            return None
+
+        if len(data) != CACHE_RECORD_SIZE:
+            return None
+        body, (checksum,) = data[:-CHECKSUM.size], CHECKSUM.unpack_from(data, len(data) - CHECKSUM.size)
+        if zlib.crc32(body) != checksum or body[-1] != DIFFICULTIES.index(difficulty):
+            return None
+
+        return unpack_grid(body[:PACKED_GRID_SIZE]), unpack_grid(body[PACKED_GRID_SIZE:2 * PACKED_GRID_SIZE])
+
+    def store(self, seed, difficulty, puzzle, solution):
+        """Writes a key's puzzle atomically, so concurrent launches never read half a file"""
+        body = b"".join((
+            pack_cells(value for row in puzzle for value in row),
+            pack_cells(value for row in solution for value in row),
+            bytes((DIFFICULTIES.index(difficulty),)),
+        ))
+        os.makedirs(self.directory, exist_ok=True)
+        write_atomic(self.path(seed, difficulty), body + CHECKSUM.pack(zlib.crc32(body)))
+
+    def get(self, seed, difficulty):
+        """Returns the (puzzle, solution) of a key, generating and caching it if needed"""
+        cached = self.load(seed, difficulty)
+        if cached:
+            return cached
+
+        puzzle, solution = generate_seeded(seed, difficulty)
+        try:
+            self.store(seed, difficulty, puzzle, solution)
+        except OSError:
+            pass  # A read-only cache still gets the right puzzle, just not a saved one
+        return puzzle, solution
+
+
+def daily_puzzle(difficulty, date=None, cache=None):
+    """Returns the (puzzle, solution) of a day's puzzle of a difficulty"""
+    return (cache or PuzzleCache()).get(daily_seed(date), difficulty)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--date", type=datetime.date.fromisoformat, help="day of the daily puzzles")
+    parser.add_argument("--seed", help="a custom seed instead of a day")
+    parser.add_argument("--cache", default=CACHE_DIR, help="cache directory")
+    args = parser.parse_args(argv)
+
+    seed = args.seed or daily_seed(args.date)
+    cache = PuzzleCache(args.cache)
+    for difficulty in DIFFICULTIES:
+        puzzle, _ = cache.get(seed, difficulty)
+        print(f"{seed} {difficulty}: " + "".join(str(value) for row in puzzle for value in row))
+
+
+if __name__ == "__main__":
+    main()
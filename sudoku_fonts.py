@@ -0,0 +1,40 @@
+"""Shared font registry and a bounded cache of rendered text surfaces"""
+from collections import OrderedDict
+
+import pygame
+
+_fonts = {}
+
+
+def get_font(path, size):
+    """Returns the Font for (path, size), loading it from disk only the first time"""
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(path, size)
+    return font
+
+
+class GlyphCache:
+    """LRU cache of anti-aliased text surfaces keyed by (font, text, color)"""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.surfaces[key] = font.render(text, True, color)
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
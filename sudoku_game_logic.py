@@ -1,126 +1,211 @@
+import math
 import random
+import sudoku_solver
+from sudoku_board import Board
+from sudoku_hints import HintEngine
+from sudoku_instruments import instruments, timed
+from sudoku_rating import band_distance, in_band, rate_puzzle
+from sudoku_solver import SolverState, has_other_solution, search, solve_grid
+from sudoku_transform import shared_seed_bank, to_grid, transform_pair
+
+# Share of the cells that removal may empty per board size: uniqueness checks on larger boards
+# grow steeply once they are sparse, so their difficulty budgets are scaled into a lower ceiling
+MAX_BLANK_SHARE = {4: 1.0, 9: 1.0, 16: 0.6, 25: 0.45}
 
 
 class SudokuGame:
-    def __init__(self):
-        self.grid = [[0] * 9 for _ in range(9)]
+    """Puzzle generation and solving
+
+    generation_mode "search" builds each puzzle from scratch with rated rejection sampling;
+    "transform" relabels and permutes a rated seed from seed_bank, which is far cheaper and
+    keeps the seed's rating (see sudoku_transform). All randomness comes from rng, so a
+    seeded random.Random makes search generation reproducible (see sudoku_daily); it
+    defaults to the random module.
+
+    Boards are size x size for any size in sudoku_solver.SIZES. Ratings, hints and transforms
+    work on 9x9 puzzles only, so other sizes generate unrated puzzles in search mode.
+    """
+
+    def __init__(self, generation_mode="search", seed_bank=None, rng=None, size=9):
+        if generation_mode == "transform" and size != 9:
+            raise ValueError("transform generation only supports 9x9 boards")
+
+        self.generation_mode = generation_mode
+        self.rng = rng or random
+        self.seed_bank = seed_bank or shared_seed_bank
+        self.size = size
+        self.grid = [[0] * size for _ in range(size)]
         self.solutions = []
         self.is_unique = True
 
-    def generate_puzzle(self, difficulty):
-        """Generates a unique Sudoku puzzle of the specified difficulty"""
-
-        self.generate_complete_grid()
+        # Compact views of the current puzzle and its solution (see sudoku_board)
+        self.board = Board(size=size)
+        self.solution_values = bytes(size * size)
+        self.hint_engine = HintEngine()
+        self.rating = None
+
+    def load(self, puzzle, solution):
+        """Sets the current puzzle and its solution, e.g. when taken from a pool or bank"""
+        self.size = len(puzzle)
+        self.grid = puzzle
+        self.solutions = [solution]
+        self.board = Board.from_grid(puzzle)
+        self.solution_values = bytes(value for row in solution for value in row)
+        self.hint_engine = HintEngine()
+        self.rating = None
+
+    def solution_digit(self, row, col):
+        return self.solution_values[row * self.size + col]
+
+    def hint(self, board=None):
+        """Returns the next logically deducible move as Hint(row, col, digit, technique), or None
+
+        Defaults to the puzzle's own board; pass the player's board to hint from their progress.
+        The logical solver only knows 9x9 boards, so other sizes get no hints.
+        """
+        board = board or self.board
+        if board.size != 9:
+            return None
+        return self.hint_engine.next_move(board.filled_values())
+
+    @timed("generate_puzzle")
+    def generate_puzzle(self, difficulty, max_attempts=500):
+        """Generates a unique Sudoku puzzle whose rating falls in the difficulty's band
+
+        Candidates are generated and rated until one lands in the band (see sudoku_rating).
+        If max_attempts run out, the candidate closest to the band is kept. Boards other than
+        9x9 cannot be rated, so their first candidate is kept and difficulty only sets how
+        many cells are removed.
+        """
+        if self.generation_mode == "transform":
+            return self.generate_transformed(difficulty)
+
+        if self.size != 9:
+            self.load(*self.generate_candidate(difficulty))
+            self.is_unique = True
+            return self.grid
 
-        # Remove cells from grid to create the puzzle
-        num_cells_to_remove = self.get_num_cells_to_remove(difficulty)
-        cells_to_remove = random.sample(range(81), num_cells_to_remove)
+        best = None
+        for _ in range(max_attempts):
+            puzzle, solution = self.generate_candidate(difficulty)
+            rating = rate_puzzle(puzzle)
+            if instruments.enabled:
+                instruments.count("generate.candidates")
 
-        for cell_index in cells_to_remove:
-            row = cell_index // 9
-            col = cell_index % 9
+            if best is None or band_distance(rating, difficulty) < band_distance(best[2], difficulty):
+                best = puzzle, solution, rating
+            if in_band(rating, difficulty):
+                break
 
-            # Temporarily store the cell value before removing the cell
-            removed_cell = self.grid[row][col]
-            self.grid[row][col] = 0
+        puzzle, solution, rating = best
+        self.is_unique = True
+        self.load(puzzle, solution)
+        self.rating = rating
 
-            # Create a grid copy to check if the resulting puzzle has a unique solution
-            grid_copy = [row[:] for row in self.grid]
-            self.is_unique = True
+        return self.grid
 
-            if self.solve_sudoku(grid_copy):
-                if not self.is_unique:
-                    # If current removed cell leads to a grid with more than one solution, put back
-                    self.grid[row][col] = removed_cell
+    def generate_transformed(self, difficulty):
+        """Generates a puzzle by randomly transforming a rated seed of the difficulty"""
+        seed_puzzle, seed_solution, rating = self.seed_bank.get(difficulty, self.rng)
+        puzzle, solution = transform_pair(seed_puzzle, seed_solution, self.rng)
 
-                    # remove the last stored solution to continue checking for uniqueness
-                    self.solutions.pop()
+        self.is_unique = True
+        self.load(to_grid(puzzle), to_grid(solution))
+        self.rating = rating
 
         return self.grid
 
-    def generate_complete_grid(self):
-        """Generates a complete Sudoku grid using recursive backtracking"""
+    def generate_candidate(self, difficulty):
+        """Generates one unrated unique puzzle and returns it with its solution"""
 
-        def solve(grid, row, col):
-            # Recursive function to fill the Sudoku grid until complete grid is generated
+        size = self.size
+        cells = size * size
+        self.grid = [[0] * size for _ in range(size)]
+        self.generate_complete_grid()
+        solution = [row[:] for row in self.grid]
 
-            if row == 9:  # Indicates end of grid
-                return True
+        # Remove cells from grid to create the puzzle; the budget is per 81 cells
+        removable = int(MAX_BLANK_SHARE[size] * cells)
+        num_cells_to_remove = self.get_num_cells_to_remove(difficulty) * removable // 81
+        cells_to_remove = self.rng.sample(range(cells), num_cells_to_remove)
 
-            next_row = row + 1 if col == 8 else row
-            next_col = (col + 1) % 9
+        for cell_index in cells_to_remove:
+            row = cell_index // size
+            col = cell_index % size
 
-            for num in range(1, 10):
-                if self.is_valid_move(grid, row, col, num):
-                    grid[row][col] = num
+            # Temporarily store the cell value before removing the cell
+            removed_cell = self.grid[row][col]
+            self.grid[row][col] = 0
 
-                    if solve(grid, next_row, next_col):
-                        return True
+            # Put the cell back if removing it lets a second solution in
+            state = SolverState.from_grid(self.grid)
+            if has_other_solution(state, cell_index, 1 << (removed_cell - 1)):
+                self.grid[row][col] = removed_cell
 
-            grid[row][col] = 0  # Backtrack if no solution is found
+        return self.grid, solution
 
-            return False
+    def generate_complete_grid(self):
+        """Generates a complete Sudoku grid using the bitmask solver with shuffled digit order"""
+
+        size = self.size
 
-        # Shuffle the numbers 1 to 9 for the first row to diversify results
-        shuffled_numbers = random.sample(range(1, 10), 9)
+        # Shuffle the digits for the first row to diversify results
+        shuffled_numbers = self.rng.sample(range(1, size + 1), size)
         self.grid[0] = shuffled_numbers
 
-        # Start solving the puzzle from the second row (1, 0)
-        solve(self.grid, 1, 0)
+        # Fill the remaining rows, trying candidates in random order
+        solved = search(SolverState.from_grid(self.grid), self.rng)
+        for row in range(size):
+            self.grid[row][:] = solved.cells[row * size:row * size + size]
 
     @staticmethod
     def get_num_cells_to_remove(difficulty):
-        """Defines difficulty levels and corresponding number of cells to remove"""
+        """Number of cells each candidate tries to remove; the rating band decides the final difficulty
+
+        Harder bands need sparser candidates: Expert removes every cell it can while the
+        solution stays unique, which lands in its band about one time in eight.
+        """
         difficulty_levels = {
             "Easy": 35,
-            "Medium": 45,
-            "Expert": 54,
+            "Medium": 54,
+            "Expert": 81,
         }
 
         return difficulty_levels.get(difficulty)
 
     def solve_sudoku(self, grid):
-        """Recursively solves sudoku grid"""
+        """Solves sudoku grid in place with the bitmask propagation solver"""
 
         grid = grid or self.grid
 
-        # Find next empty cell
-        empty_cell = self.find_empty_cell(grid)
-
-        # If no more empty cells, puzzle is solved
-        if not empty_cell:
-            if grid not in self.solutions:
-                self.solutions.append(grid)
-
-            if len(self.solutions) > 1:  # Check for multiple solutions
-                self.is_unique = False
-
-            return True
+        solved = solve_grid(grid)
+        if solved is None:
+            return False
 
-        # Solve the puzzle by trying digits from 1 to 9 within the empty cells
-        row, col = empty_cell
+        for row in range(len(grid)):
+            grid[row][:] = solved[row]
 
-        for num in range(1, 10):
-            if self.is_valid_move(grid, row, col, num):
-                grid[row][col] = num
+        if not self.solutions:
+            self.solutions.append(grid)
 
-                if self.solve_sudoku(grid):
-                    return True
+        return True
 
-        # If num recursively leads to dead-end, backtrack
-        grid[row][col] = 0
+    @staticmethod
+    def count_solutions(grid, limit=2):
+        """Counts the solutions of a grid, stopping early once the limit is reached"""
+        state = SolverState.from_grid(grid)
+        if state is None:
+            return 0
 
-        return False
+        return sudoku_solver.count_solutions(state, limit)
 
     @staticmethod
     def find_empty_cell(grid):
         """Finds the next empty cell in the grid"""
-        for row in range(9):
-            for col in range(9):
-                # Check for cells with notes, empty cells or wrongly filled cells
-                if isinstance(grid[row][col], str):
-                    return row, col
-                elif grid[row][col] == 0 or grid[row][col] < 0:
+        for row in range(len(grid)):
+            for col in range(len(grid)):
+                # Player entries and notes live in a Board, so plain grids only hold digits and 0
+                if grid[row][col] == 0:
                     return row, col
         return None
 
@@ -133,18 +218,29 @@ class SudokuGame:
             return False
 
         # Check if num is already present in the same column
-        if num in [grid[i][col] for i in range(9)]:
+        if num in [grid[i][col] for i in range(len(grid))]:
             return False
 
-        # Check if num is already present in the 3x3 subgrid
-        start_row, start_col = 3 * (row // 3), 3 * (col // 3)
-        for i in range(start_row, start_row + 3):
-            for j in range(start_col, start_col + 3):
+        # Check if num is already present in the subgrid (3x3 on a 9x9 board)
+        box = math.isqrt(len(grid))
+        start_row, start_col = box * (row // box), box * (col // box)
+        for i in range(start_row, start_row + box):
+            for j in range(start_col, start_col + box):
                 if grid[i][j] == num:
                     return False
 
         return True
 
-    def is_solved(self, grid):
-        """Returns True if the final grid matches the unique solution, False otherwise"""
-        return grid == self.solutions[0]
+    def is_solved(self, board):
+        """Returns True if the board is filled with digits matching the unique solution
+
+        Player digits are validated against the solution as they are placed, so a complete
+        board is a solved one and the check is a counter comparison.
+        """
+        return board.is_complete()
+
+
+if __name__ == "__main__":
+    from sudoku_batch import main
+
+    main()
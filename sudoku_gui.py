@@ -1,22 +1,57 @@
-import copy
+import math
+import os
+import time
 import pygame
-from sudoku_game_logic import SudokuGame
+from sudoku_bank import PuzzleBank
+from sudoku_board import DIGIT_SYMBOLS, GIVEN, WRONG
+from sudoku_daily import daily_puzzle
+from sudoku_fonts import GlyphCache, get_font
+from sudoku_instruments import instruments, timed
+from sudoku_layout import BoardLayout
+from sudoku_puzzle_pool import PuzzlePool
+from sudoku_save import Autosaver, encode_snapshot, load_snapshot
+from sudoku_session import GameSession
+
+# Fonts, the puzzle bank and the save live beside this module, so the game runs from any working directory
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def session_state(name, doc=None):
+    """A SudokuUI attribute that forwards to the game session, which owns the value"""
+    return property(lambda self: getattr(self.session, name),
+                    lambda self, value: setattr(self.session, name, value), doc=doc)
 
 
 class SudokuUI:
-    def __init__(self):
+    board = session_state('board', "The player's Board, or None before the first game")
+    game = session_state('game')
+    history = session_state('history')
+    current_lives = session_state('current_lives')
+    max_lives = session_state('max_lives')
+    notes_mode = session_state('notes_mode')
+    auto_solve = session_state('auto_solve')
+    game_won = session_state('game_won')
+    game_end = session_state('game_end')
+    solving = session_state('solving')
+    solve_started = session_state('solve_started')
+
+    def __init__(self, pool_depth=2, bank_path='puzzles.bank', solve_step_ms=20, history_depth=500,
+                 save_path='savegame.sav', daily=False, size=9):
         self.WINDOW_SIZE = (720, 790)
         self.MARGIN = 90
-        self.CELL_SIZE = 60
         self.WINDOW_BG_COLOR = '#F7F7E8'
-
-        self.new_game_rect = pygame.Rect(530, 5, 100, 30)
-        self.menu_buttons = {}
-        self.num_button_rects = []
-        self.solve_button_rect = pygame.Rect(90, 50, 80, 35)
-        self.del_button_rect = pygame.Rect(380, 710, 70, 30)
-        self.notes_button_rect = pygame.Rect(290, 710, 70, 30)
-        self.notes_mode = False
+        self.TEXT_FONT = os.path.join(ASSET_DIR, 'fonts', 'Anta-Regular.ttf')
+        self.TITLE_FONT = os.path.join(ASSET_DIR, 'fonts', 'PressStart2P-Regular.ttf')
+
+        # Board size (see sudoku_solver.SIZES); saves, the bank and daily puzzles are 9x9 only
+        self.size = size
+        self.box = math.isqrt(size)
+        classic = size == 9
+
+        # All clickable geometry is computed once, so hit tests never allocate; the cell size
+        # follows from the window and the board size
+        self.layout = BoardLayout(self.WINDOW_SIZE, self.MARGIN, size)
+        self.CELL_SIZE = self.layout.cell_size
         self.note_colors = ['#00BCD4', '#388E3C', '#4E342E', '#7986CB', '#C0CA33', '#827717', '#757575', '#424242',
                             '#009688']
 
@@ -25,162 +60,256 @@ class SudokuUI:
         self.screen = pygame.display.set_mode(self.WINDOW_SIZE)
         pygame.display.set_caption("Sudoku Arcade")
         self.clock = pygame.time.Clock()
-        self.start_time = pygame.time.get_ticks()
-        self.end_time = None
 
-        # Initialize game logic
-        self.game = SudokuGame()
+        # The session owns the rules and game state (see sudoku_session); this class only draws it
+        # and turns clicks into session calls. Auto-solve steps are driven by the main loop.
+        self.session = GameSession(pygame.time.get_ticks, solve_step_ms, history_depth)
         self.difficulty = None
 
-        # Sudoku Board Parameters
-        self.sudoku_board = None
-        self.grid = None
-        self.font = pygame.font.Font('fonts/Anta-Regular.ttf', 25)
+        # Daily mode plays the day's seeded puzzle of each difficulty (see sudoku_daily)
+        self.daily = daily and classic
+
+        # Optional pre-generated bank (see sudoku_bank); preferred over the pool when present.
+        # A relative path is taken from ASSET_DIR, not the working directory
+        self.puzzle_bank = None
+        bank_path = bank_path and os.path.join(ASSET_DIR, bank_path)
+        if bank_path and classic and os.path.exists(bank_path):
+            try:
+                self.puzzle_bank = PuzzleBank(bank_path)
+            except (ValueError, OSError):
+                pass  # A damaged or unreadable bank must not stop the game; the pool serves instead
+
+        # The pool pre-generates puzzles so new games start instantly. Daily games never draw on it
+        # and a bank serves every game, so neither starts the workers; the pool then only generates
+        # on demand, e.g. for a difficulty the bank lacks
+        idle = self.daily or self.puzzle_bank is not None
+        self.puzzle_pool = PuzzlePool(depth=0 if idle else pool_depth, size=size)
+
+        # Save game (see sudoku_save); written off the render thread whenever the game changes.
+        # A relative path is taken from ASSET_DIR, so every launch resumes the same save
+        self.save_path = os.path.join(ASSET_DIR, save_path) if save_path and classic else None
+        self.autosaver = Autosaver(self.save_path) if self.save_path else None
+        self.saved_state = None
+
+        # View state
+        self.hint_text = None
+        self.glyphs = GlyphCache()
         self.selected_cell = None
         self.highlighted_cell = None
-        self.current_lives = 4
-        self.max_lives = 4
-        self.auto_solve = False
-        self.game_won = False
-        self.game_end = False
         self.freeze_screen = False
 
+        # Render bookkeeping: the main loop only redraws when a frame is marked dirty
+        self.dirty = True
+        self.frame_stats = {'rendered': 0, 'skipped': 0}
+        self.show_overlay = False
+
+        # Layered rendering: static layers are built once, cells are cached until their value changes
+        self.menu_layer = None
+        self.board_layer = None
+        self.lines_layer = None
+        self.lines_origin = (0, 0)
+        self.cell_cache = {}
+        self.full_redraw = True
+        self.update_rects = []
+        self.previous_dynamic_rects = []
+
+    def render_text(self, text, size, color, font_path=None):
+        """Returns a text surface from the glyph cache, rendering it only on first use"""
+        font = get_font(font_path or self.TEXT_FONT, size)
+        return self.glyphs.render(font, text, color)
+
     def game_menu(self):
-        """Renders the game menu UI"""
-        background = pygame.Rect(0, 0, self.WINDOW_SIZE[0], self.WINDOW_SIZE[1])
-        pygame.draw.rect(self.screen, self.WINDOW_BG_COLOR, background)
+        """Renders the game menu UI from a surface built on first use"""
+        if self.menu_layer is None:
+            self.menu_layer = pygame.Surface(self.WINDOW_SIZE)
+            self.menu_layer.fill(self.WINDOW_BG_COLOR)
+
+            text_surface = self.render_text('SUDOKU ARCADE', 40, '#827717', self.TITLE_FONT)
+            text_rect = text_surface.get_rect(center=(360, 200))
+            self.menu_layer.blit(text_surface, text_rect)
+
+            text_surface = self.render_text('Choose Difficulty', 20, (0, 0, 0))
+            text_rect = text_surface.get_rect(center=(360, 265))
+            self.menu_layer.blit(text_surface, text_rect)
+
+            for text, button in self.layout.menu_buttons.items():
+                pygame.draw.rect(self.menu_layer, '#FBECB2', button)
+                pygame.draw.rect(self.menu_layer, '#45474B', button, 3)
+                text_surface = self.render_text(text, 18, (0, 0, 0))
+                text_rect = text_surface.get_rect(center=button.center)
+                self.menu_layer.blit(text_surface, text_rect)
+
+        self.screen.blit(self.menu_layer, (0, 0))
+        self.full_redraw = True
+
+    def build_board_layers(self):
+        """Pre-renders the parts of the board screen that stay fixed during a game"""
+        # Background, buttons and labels sit underneath the cells
+        self.board_layer = pygame.Surface(self.WINDOW_SIZE)
+        self.board_layer.fill(self.WINDOW_BG_COLOR)
+        self.draw_new_game_button(self.board_layer)
+        self.draw_solve_button(self.board_layer)
+        self.draw_num_buttons(self.board_layer)
+        self.draw_delete_button(self.board_layer)
+        self.draw_auto_notes_button(self.board_layer)
+
+        # Cell borders and the thicker subgrid lines are drawn over the cells
+        grid_size = self.size * self.CELL_SIZE + 4
+        self.lines_layer = pygame.Surface((grid_size, grid_size), pygame.SRCALPHA)
+        self.lines_origin = (self.MARGIN - 2, self.MARGIN - 2)
+        grid_ln_color = '#7B8F7A'
+        subgrid_ln_color = '#12372A'
+
+        # Coordinates are relative to the layer, which starts 2px above and left of the grid
+        for i in range(self.size):
+            for j in range(self.size):
+                x0 = 2 + j * self.CELL_SIZE
+                y0 = 2 + i * self.CELL_SIZE
+                pygame.draw.rect(self.lines_layer, grid_ln_color, (x0, y0, self.CELL_SIZE, self.CELL_SIZE), 1)
+
+        box_extent = self.CELL_SIZE * self.box
+        for i in range(0, self.size, self.box):
+            for j in range(0, self.size, self.box):
+                x0 = 2 + j * self.CELL_SIZE
+                y0 = 2 + i * self.CELL_SIZE
+                pygame.draw.rect(self.lines_layer, subgrid_ln_color,
+                                 (x0 - 1, y0 - 1, box_extent + 2, box_extent + 2), 3)
+
+        self.cell_cache = {}
+        self.full_redraw = True
+
+    def get_cell_surface(self, board, i, j):
+        """Returns (surface, changed) for a cell, re-rendering it only when its value changes
+
+        The surface is None for empty cells; changed tells whether the cell differs from the last frame.
+        """
+        index = i * self.size + j
+        value = board.values[index]
+        notes = board.notes[index]
+        status = board.status[index]
+        key = (value, notes, status)
+
+        cached = self.cell_cache.get((i, j))
+        if cached and cached[0] == key:
+            return cached[1], False
+
+        surface = None
+        width = height = self.CELL_SIZE
+
+        # Draw non-zero numbers within cells
+        if value or notes:
+            surface = pygame.Surface((width, height), pygame.SRCALPHA)
+
+            if not value:  # Empty cell holding notes
+                self.draw_notes(board.note_digits(i, j), 0, 0, width, height, surface)
+            else:
+                # Set background color based on the cell value; even or odd
+                even_color = '#9DAD7F'
+                odd_color = '#C7CFB7'
+                cell_bg_color = even_color if value % 2 == 0 else odd_color
 
-        font = pygame.font.Font('fonts/PressStart2P-Regular.ttf', 40)
-        text_surface = font.render('SUDOKU ARCADE', True, '#827717')
-        text_rect = text_surface.get_rect(center=(360, 200))
-        self.screen.blit(text_surface, text_rect)
+                surface.fill(cell_bg_color)
 
-        font = pygame.font.Font('fonts/Anta-Regular.ttf', 20)
-        text_surface = font.render('Choose Difficulty', True, (0, 0, 0))
-        text_rect = text_surface.get_rect(center=(360, 265))
-        self.screen.blit(text_surface, text_rect)
+                # Set text color: black for original numbers, red for invalid inputs, and blue for valid inputs
+                text_color = 'black' if status == GIVEN else (
+                    'red' if status == WRONG else '#176CF0')
 
-        easy_btn = pygame.Rect(285, 290, 150, 30)
-        medium_btn = pygame.Rect(285, 330, 150, 30)
-        expert_btn = pygame.Rect(285, 370, 150, 30)
-        self.menu_buttons = {'Easy': easy_btn, 'Medium': medium_btn, 'Expert': expert_btn}
-        for text, button in self.menu_buttons.items():
-            pygame.draw.rect(self.screen, '#FBECB2', button)
-            pygame.draw.rect(self.screen, '#45474B', button, 3)
-            font = pygame.font.Font('fonts/Anta-Regular.ttf', 18)
-            text_surface = font.render(text, True, (0, 0, 0))
-            text_rect = text_surface.get_rect(center=button.center)
-            self.screen.blit(text_surface, text_rect)
-
-    def draw_grid(self, grid):
-        """Draws Sudoku Grid"""
-        self.screen.fill(self.WINDOW_BG_COLOR)
-
-        # Draw grid cells
-        for i in range(9):
-            for j in range(9):
-                x0 = self.MARGIN + j * self.CELL_SIZE
-                y0 = self.MARGIN + i * self.CELL_SIZE
-                width = height = self.CELL_SIZE
-                grid_ln_color = '#7B8F7A'
-
-                # Draw non-zero numbers within cells
-                if grid[i][j] != 0:
-                    if isinstance(grid[i][j], str):  # check if cell contains notes
-                        self.draw_notes(grid[i][j], x0, y0, width, height)
-                    else:
-                        # Set background color based on the cell value; even or odd
-                        even_color = '#9DAD7F'
-                        odd_color = '#C7CFB7'
-                        cell_bg_color = even_color if grid[i][j] % 2 == 0 else odd_color
-
-                        pygame.draw.rect(self.screen, cell_bg_color, (x0, y0, width, height))
-
-                        # Set text color: black for original numbers, red for invalid inputs, and blue for valid inputs
-                        text_color = 'black' if self.sudoku_board[i][j] != 0 else (
-                            'red' if grid[i][j] < 0 else '#176CF0')
-
-                        # Convert negative value (wrong entry) to positive for rendering
-                        num = abs(grid[i][j])
-
-                        # Render value within cells
-                        text = self.font.render(str(num), True, text_color)
-                        text_rect = text.get_rect(center=(x0 + width // 2, y0 + height // 2))
-                        self.screen.blit(text, text_rect)
-
-                # Draw grid lines
-                pygame.draw.rect(self.screen, grid_ln_color, (x0, y0, width, height), 1)
-
-        # Draw thicker grid lines
-        for i in range(9):
-            for j in range(9):
+                text = self.render_text(DIGIT_SYMBOLS[value - 1], 25 * self.CELL_SIZE // 60, text_color)
+                text_rect = text.get_rect(center=(width // 2, height // 2))
+                surface.blit(text, text_rect)
+
+        self.cell_cache[(i, j)] = (key, surface)
+        return surface, cached is not None or surface is not None
+
+    @timed("draw_grid")
+    def draw_grid(self, board):
+        """Draws Sudoku Grid by compositing the static layers, cached cells and dynamic overlays"""
+        if self.board_layer is None:
+            self.build_board_layers()
+
+        self.screen.blit(self.board_layer, (0, 0))
+        update_rects = []
+
+        for i in range(self.size):
+            for j in range(self.size):
+                surface, changed = self.get_cell_surface(board, i, j)
                 x0 = self.MARGIN + j * self.CELL_SIZE
                 y0 = self.MARGIN + i * self.CELL_SIZE
-                width = height = self.CELL_SIZE
-                subgrid_ln_color = '#12372A'
-                highlight_color = '#FFAB40'
-
-                if i % 3 == 0 and j % 3 == 0:
-                    pygame.draw.rect(self.screen, subgrid_ln_color,
-                                     (x0 - 1, y0 - 1, self.CELL_SIZE * 3 + 2, self.CELL_SIZE * 3 + 2), 3)
-
-                # Highlight selected cell
-                if self.selected_cell == (i, j):
-                    pygame.draw.rect(self.screen, highlight_color, (x0, y0, width, height), 3)
-                    self.highlighted_cell = self.selected_cell
-
-        # Keep highlight on selected cell when another button is clicked
-        if self.selected_cell is None:
-            if self.highlighted_cell:
-                row, col = self.highlighted_cell
-                x0 = self.MARGIN + col * self.CELL_SIZE
-                y0 = self.MARGIN + row * self.CELL_SIZE
-                pygame.draw.rect(self.screen, '#FFAB40', (x0, y0, self.CELL_SIZE, self.CELL_SIZE), 3)
-
-        self.draw_lives()
-        self.update_clock()
-        self.draw_new_game_button()
-        self.draw_solve_button()
-        self.draw_num_buttons()
-        self.draw_notes_button()
-        self.draw_delete_button()
+
+                if surface:
+                    self.screen.blit(surface, (x0, y0))
+                if changed:
+                    # Inflate to cover the subgrid lines that overlap the cell edge
+                    update_rects.append(pygame.Rect(x0 - 2, y0 - 2, self.CELL_SIZE + 4, self.CELL_SIZE + 4))
+
+        self.screen.blit(self.lines_layer, self.lines_origin)
+
+        # Highlight selected cell, keeping the highlight when another button is clicked
+        dynamic_rects = []
+        if self.selected_cell:
+            self.highlighted_cell = self.selected_cell
+        if (self.selected_cell or self.selected_cell is None) and self.highlighted_cell:
+            row, col = self.highlighted_cell
+            dynamic_rects.extend(self.draw_completed_units(board, row, col))
+            dynamic_rects.append(pygame.draw.rect(self.screen, '#FFAB40', self.layout.cell_rects[row][col], 3))
+
+        dynamic_rects.extend(self.draw_completed_num_buttons(board))
+        if self.hint_text:
+            dynamic_rects.append(self.draw_hint_text())
+        dynamic_rects.append(self.draw_lives())
+        dynamic_rects.append(self.draw_progress(board))
+        dynamic_rects.append(self.update_clock())
+        dynamic_rects.append(self.draw_notes_button())
+        if self.show_overlay:
+            dynamic_rects.append(self.draw_perf_overlay())
 
         # Display results at game end
         if self.game_end:
-            self.display_results()
+            dynamic_rects.append(self.display_results())
             self.freeze_screen = True
 
-    def draw_new_game_button(self):
+        # Refresh this frame's overlays plus wherever last frame's overlays were drawn
+        self.update_rects = update_rects + dynamic_rects + self.previous_dynamic_rects
+        self.previous_dynamic_rects = dynamic_rects
+
+    def present(self):
+        """Pushes the frame to the display: only changed regions, or everything after a full redraw"""
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.update_rects)
+        self.update_rects = []
+
+    def draw_new_game_button(self, surface):
         button_text = 'New Game'
         button_color = '#FBECB2'
 
         # Draw button and border
-        pygame.draw.rect(self.screen, button_color, self.new_game_rect)
-        pygame.draw.rect(self.screen, '#45474B', self.new_game_rect, 3)
+        pygame.draw.rect(surface, button_color, self.layout.new_game_rect)
+        pygame.draw.rect(surface, '#45474B', self.layout.new_game_rect, 3)
 
         # Draw the text on the button
-        font = pygame.font.Font('fonts/Anta-Regular.ttf', 18)
-        text_surface = font.render(button_text, True, (0, 0, 0))
-        text_rect = text_surface.get_rect(center=self.new_game_rect.center)
-        self.screen.blit(text_surface, text_rect)
+        text_surface = self.render_text(button_text, 18, (0, 0, 0))
+        text_rect = text_surface.get_rect(center=self.layout.new_game_rect.center)
+        surface.blit(text_surface, text_rect)
 
         # Display text for game difficulty at the top
-        text_surface = font.render(self.difficulty, True, (0, 0, 0))
+        text_surface = self.render_text(self.difficulty, 18, (0, 0, 0))
         text_rect = text_surface.get_rect(center=(360, 25))
-        self.screen.blit(text_surface, text_rect)
+        surface.blit(text_surface, text_rect)
 
-    def draw_solve_button(self):
+    def draw_solve_button(self, surface):
         button_text = 'solve'
         button_color = '#31A52C'
 
-        pygame.draw.rect(self.screen, button_color, self.solve_button_rect,
+        pygame.draw.rect(surface, button_color, self.layout.solve_button_rect,
                          border_radius=7)
-        pygame.draw.rect(self.screen, '#12372A', self.solve_button_rect, border_radius=7, width=3)
+        pygame.draw.rect(surface, '#12372A', self.layout.solve_button_rect, border_radius=7, width=3)
 
-        font = pygame.font.Font('fonts/Anta-Regular.ttf', 25)
-        text_surface = font.render(button_text, True, (0, 0, 0))
-        text_rect = text_surface.get_rect(center=self.solve_button_rect.center)
-        self.screen.blit(text_surface, text_rect)
+        text_surface = self.render_text(button_text, 25, (0, 0, 0))
+        text_rect = text_surface.get_rect(center=self.layout.solve_button_rect.center)
+        surface.blit(text_surface, text_rect)
 
     def draw_lives(self):
         """Displays player's remaining lives"""
@@ -191,6 +320,7 @@ class SudokuUI:
         total_width = 4 * 2.5 * circle_radius
         horizontal_offset = (self.WINDOW_SIZE[0] - total_width) // 2
 
+        lives_rect = pygame.Rect(horizontal_offset, self.MARGIN - 20, 0, 0)
         for i in range(self.max_lives):
             x = horizontal_offset + (i * 2.5 * circle_radius) + circle_radius
             y = self.MARGIN - 20
@@ -198,105 +328,166 @@ class SudokuUI:
             # Set circle color based on remaining lives
             circle_color = circle_color if i < self.current_lives else '#B4B4B8'
 
-            pygame.draw.circle(self.screen, circle_color, (x, y), circle_radius)
+            lives_rect.union_ip(pygame.draw.circle(self.screen, circle_color, (x, y), circle_radius))
 
-    def draw_num_buttons(self):
+        return lives_rect
+
+    def draw_progress(self, board):
+        """Displays how many cells are left to fill and how many wrong entries are on the board"""
+        text = f"{board.remaining} left"
+        if board.wrong_count:
+            text += f", {board.wrong_count} wrong"
+
+        text_surface = self.render_text(text, 16, '#424242')
+        solve_rect = self.layout.solve_button_rect
+        text_rect = text_surface.get_rect(midleft=(solve_rect.right + 15, solve_rect.centery))
+        return self.screen.blit(text_surface, text_rect)
+
+    def draw_completed_units(self, board, row, col):
+        """Outlines the highlighted cell's row, column and box once each of them is filled in"""
+        cell_rects = self.layout.cell_rects
+        top, left = row - row % self.box, col - col % self.box
+        units = (
+            cell_rects[row][0].union(cell_rects[row][-1]),
+            cell_rects[0][col].union(cell_rects[-1][col]),
+            cell_rects[top][left].union(cell_rects[top + self.box - 1][left + self.box - 1]),
+        )
+
+        return [pygame.draw.rect(self.screen, '#43A047', rect, 3)
+                for rect, complete in zip(units, board.completed_units(row, col)) if complete]
+
+    def draw_num_buttons(self, surface):
         """Draws clickable numbers for entering values into grid"""
         button_color = '#C7CFB7'
         text_color = '#263238'
 
-        for num in range(1, 10):
-            x0 = self.MARGIN + num * 0.86 * self.CELL_SIZE
-            y0 = self.WINDOW_SIZE[1] - 130
-
-            button_rect = pygame.Rect(x0, y0, 30, 30)
-            self.num_button_rects.append(button_rect)
+        for num, button_rect in enumerate(self.layout.num_button_rects, start=1):
+            pygame.draw.rect(surface, button_color, button_rect, border_radius=3)
 
-            pygame.draw.rect(self.screen, button_color, button_rect, border_radius=3)
-
-            button_text = str(num)
-            font = pygame.font.Font('fonts/Anta-Regular.ttf', 15)
-            text_surface = font.render(button_text, True, text_color)
+            button_text = DIGIT_SYMBOLS[num - 1]
+            text_surface = self.render_text(button_text, 15, text_color)
             text_rect = text_surface.get_rect(center=button_rect.center)
-            self.screen.blit(text_surface, text_rect)
+            surface.blit(text_surface, text_rect)
+
+    def draw_completed_num_buttons(self, board):
+        """Dims the number pad buttons of digits that are already placed in every row"""
+        rects = []
+
+        for num, button_rect in enumerate(self.layout.num_button_rects, start=1):
+            if board.digit_complete(num):
+                rects.append(pygame.draw.rect(self.screen, '#E4E7DC', button_rect, border_radius=3))
+                text_surface = self.render_text(DIGIT_SYMBOLS[num - 1], 15, '#B4B4B8')
+                self.screen.blit(text_surface, text_surface.get_rect(center=button_rect.center))
+
+        return rects
+
+    def draw_hint_text(self):
+        """Names the technique behind the last hint below the action buttons"""
+        text_surface = self.render_text(self.hint_text, 16, '#424242')
+        text_rect = text_surface.get_rect(center=(self.WINDOW_SIZE[0] // 2, 765))
+        return self.screen.blit(text_surface, text_rect)
+
+    def toggle_overlay(self):
+        """Shows or hides the performance overlay; showing it switches instrumentation on"""
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            instruments.enable()
+        self.dirty = True
+
+    def draw_perf_overlay(self):
+        """Draws FPS, frame-time percentiles and the last puzzle generation time in the top-left corner"""
+        def ms(value):
+            return '-' if value is None else f"{value:.1f}"
+
+        fps = instruments.rate('frame')
+        generation = instruments.last('puzzle_generation')
+        if generation is None:
+            generation = instruments.last('generate_puzzle')
+
+        lines = (
+            f"FPS {ms(fps)}  events/frame {ms(instruments.mean('events_per_frame'))}",
+            f"frame ms p50 {ms(instruments.percentile('frame', 50))}  p95 {ms(instruments.percentile('frame', 95))}"
+            f"  p99 {ms(instruments.percentile('frame', 99))}",
+            f"generation {ms(generation)} ms  fetch {ms(instruments.last('puzzle_fetch'))} ms",
+        )
+
+        # The text changes every frame, so it bypasses the glyph cache rather than flushing it
+        font = get_font(self.TEXT_FONT, 12)
+        overlay_rect = pygame.Rect(6, 4, 0, 0)
+        for line_number, line in enumerate(lines):
+            text_surface = font.render(line, True, '#424242')
+            overlay_rect.union_ip(self.screen.blit(text_surface, (6, 4 + 14 * line_number)))
+
+        return overlay_rect
 
     def draw_notes_button(self):
         button_color = '#009688' if self.notes_mode else '#C7CFB7'
         text_color = '#263238'
 
-        pygame.draw.rect(self.screen, button_color, self.notes_button_rect)
-        pygame.draw.rect(self.screen, '#757575', self.notes_button_rect, width=3)
+        pygame.draw.rect(self.screen, button_color, self.layout.notes_button_rect)
+        pygame.draw.rect(self.screen, '#757575', self.layout.notes_button_rect, width=3)
 
-        font = pygame.font.Font('fonts/Anta-Regular.ttf', 18)
-        text_surface = font.render('notes', True, text_color)
-        text_rect = text_surface.get_rect(center=self.notes_button_rect.center)
+        text_surface = self.render_text('notes', 18, text_color)
+        text_rect = text_surface.get_rect(center=self.layout.notes_button_rect.center)
         self.screen.blit(text_surface, text_rect)
 
-    def draw_delete_button(self):
-        pygame.draw.rect(self.screen, '#C7CFB7', self.del_button_rect)
-        pygame.draw.rect(self.screen, '#757575', self.del_button_rect, width=3)
-        font = pygame.font.Font('fonts/Anta-Regular.ttf', 18)
-        text_surface = font.render('Delete', True, '#263238')
-        text_rect = text_surface.get_rect(center=self.del_button_rect.center)
-        self.screen.blit(text_surface, text_rect)
+        return self.layout.notes_button_rect
+
+    def draw_delete_button(self, surface):
+        pygame.draw.rect(surface, '#C7CFB7', self.layout.del_button_rect)
+        pygame.draw.rect(surface, '#757575', self.layout.del_button_rect, width=3)
+        text_surface = self.render_text('Delete', 18, '#263238')
+        text_rect = text_surface.get_rect(center=self.layout.del_button_rect.center)
+        surface.blit(text_surface, text_rect)
+
+    def draw_auto_notes_button(self, surface):
+        pygame.draw.rect(surface, '#C7CFB7', self.layout.auto_notes_rect)
+        pygame.draw.rect(surface, '#757575', self.layout.auto_notes_rect, width=3)
+        text_surface = self.render_text('auto', 18, '#263238')
+        text_rect = text_surface.get_rect(center=self.layout.auto_notes_rect.center)
+        surface.blit(text_surface, text_rect)
 
-    def draw_notes(self, notes_str, x0, y0, cell_width, cell_height):
+    def draw_notes(self, note_digits, x0, y0, cell_width, cell_height, surface):
         """Arranges notes at specific positions within a cell"""
-        cell_margin = 5
+        cell_margin = 5 * self.CELL_SIZE // 60
+        font_size = max(6, 16 * self.CELL_SIZE // 60)
 
-        # Create 3x3 grid for arranging notes within the cell
-        num_rows = 3
-        num_cols = 3
+        # Notes sit in a grid shaped like a box (3x3 on a 9x9 board), one slot per digit
+        num_rows = num_cols = self.box
 
         # Calculate spacing for each row and column
         row_spacing = (cell_height - cell_margin * 2) // num_rows
         col_spacing = (cell_width - cell_margin * 2) // num_cols
 
-        # Map note numbers to their fixed positions within the cell
-        note_positions = {
-            1: (0, 0),
-            2: (0, 1),
-            3: (0, 2),
-            4: (1, 0),
-            5: (1, 1),
-            6: (1, 2),
-            7: (2, 0),
-            8: (2, 1),
-            9: (2, 2),
-        }
-
-        # Iterate through notes string, converting to integers
-        for i, char in enumerate(notes_str):
-            note_num = int(char)
-
-            # Get the designated position for the note
-            row, col = note_positions[note_num]
+        for note_num in note_digits:
+            # Get the designated position for the note: digits fill the slots row by row
+            row, col = divmod(note_num - 1, num_cols)
 
             # Calculate x, y coordinates based on designated position
-            note_x = x0 + cell_margin + col * col_spacing + 9
-            note_y = y0 + cell_margin + row * row_spacing + 9
+            note_x = x0 + cell_margin + col * col_spacing + col_spacing // 2 + 1
+            note_y = y0 + cell_margin + row * row_spacing + row_spacing // 2 + 1
 
             # Render and draw note text with specified color
-            font = pygame.font.Font('fonts/Anta-Regular.ttf', 16)
-            note_text = font.render(str(note_num), True, self.note_colors[note_num - 1])
+            note_color = self.note_colors[(note_num - 1) % len(self.note_colors)]
+            note_text = self.render_text(DIGIT_SYMBOLS[note_num - 1], font_size, note_color)
             note_rect = note_text.get_rect(center=(note_x, note_y))
-            self.screen.blit(note_text, note_rect)
+            surface.blit(note_text, note_rect)
+
+    def elapsed_ms(self):
+        return self.session.elapsed_ms()
 
     def update_clock(self):
         """Displays elapsed time during game"""
-        if not self.game_end:
-            elapsed_time = pygame.time.get_ticks() - self.start_time
-        else:
-            elapsed_time = self.end_time - self.start_time
+        elapsed_time = self.elapsed_ms()
 
         minutes = elapsed_time // 60000
         seconds = (elapsed_time // 1000) % 60
 
         time_str = f"{minutes:02d}:{seconds:02d}"
 
-        text_surface = self.font.render(time_str, True, (0, 0, 0))
+        text_surface = self.render_text(time_str, 25, (0, 0, 0))
         text_rect = text_surface.get_rect(topright=(self.WINDOW_SIZE[0] - self.MARGIN, 60))
-        self.screen.blit(text_surface, text_rect)
+        return self.screen.blit(text_surface, text_rect)
 
     def display_results(self):
         """Displays game results"""
@@ -305,7 +496,7 @@ class SudokuUI:
         if self.auto_solve:
             display_msg = "Sudoku solved!"
 
-        text_surface = self.font.render(display_msg, True, 'black')
+        text_surface = self.render_text(display_msg, 25, 'black')
         text_rect = text_surface.get_rect(center=(350, 355))
 
         padding_x = 10
@@ -313,127 +504,187 @@ class SudokuUI:
         text_rect.width += 2 * padding_x
         text_rect.height += 2 * padding_y
 
-        pygame.draw.rect(self.screen, '#FBECB2', text_rect)
+        box_rect = pygame.draw.rect(self.screen, '#FBECB2', text_rect)
         pygame.draw.rect(self.screen, '#45474B', text_rect, 3)
 
         text_rect.x += padding_x
         text_rect.y += padding_y
         self.screen.blit(text_surface, text_rect)
 
+        return box_rect
+
     def get_clicked_cell(self, mouse_cor):
         """Converts mouse position to grid cell indices"""
-        x, y = mouse_cor
-        if (self.MARGIN < x < self.WINDOW_SIZE[0] - self.MARGIN) and (self.MARGIN < y < self.WINDOW_SIZE[1] - 160):
-            row = (y - self.MARGIN) // self.CELL_SIZE
-            col = (x - self.MARGIN) // self.CELL_SIZE
-            return row, col
+        return self.layout.cell_at(mouse_cor)
 
     def num_button_clicked(self, mouse_cor):
         """Detects clicks on the on-screen num buttons"""
         if self.highlighted_cell:
-            for num in range(1, 10):
-                if self.num_button_rects[num - 1].collidepoint(mouse_cor):
-                    return num
+            return self.layout.num_button_at(mouse_cor)
 
     def notes_button_clicked(self, mouse_cor):
         """Toggles notes mode on or off"""
-        if self.notes_button_rect.collidepoint(mouse_cor):
-            self.notes_mode = not self.notes_mode
+        if self.layout.notes_button_rect.collidepoint(mouse_cor):
+            self.session.toggle_notes_mode()
             return True
 
     def del_button_clicked(self, row, col, mouse_cor):
         """Detects click of delete button"""
-        if self.del_button_rect.collidepoint(mouse_cor):
-            if self.sudoku_board[row][col] == 0:
-                self.grid[row][col] = 0
+        if self.layout.del_button_rect.collidepoint(mouse_cor):
+            self.clear_cell(row, col)
+
+    def auto_notes_clicked(self, mouse_cor):
+        """Fills every empty cell's notes with its legal candidates as one undoable move"""
+        if not self.freeze_screen and self.layout.auto_notes_rect.collidepoint(mouse_cor):
+            self.session.fill_notes()
+            return True
+
+    def show_hint(self):
+        """Fills in the next logically deducible cell and names the technique that finds it"""
+        if self.game_end or self.solving:
+            return
+
+        if self.size != 9:
+            self.hint_text = 'hints need a 9x9 board'
+            return
+
+        hint = self.session.hint()
+        if hint is None:
+            self.hint_text = 'no hint: this position needs guessing'
+            return
+
+        self.selected_cell = (hint.row, hint.col)
+        self.hint_text = f'hint: {hint.technique}'
+
+    def clear_cell(self, row, col):
+        """Deletes the player's digit or notes from a cell; givens are left alone"""
+        self.session.clear_cell(row, col)
+
+    def undo(self):
+        """Reverts the last board change and selects its cell. Lives lost stay lost"""
+        cell = self.session.undo()
+        if cell:
+            self.selected_cell = cell
+
+    def redo(self):
+        """Re-applies the last undone board change and selects its cell"""
+        cell = self.session.redo()
+        if cell:
+            self.selected_cell = cell
 
     def solve_button_clicked(self, mouse_cor):
         """Detects solve button click and calls solve method"""
         if not self.freeze_screen:
-            if self.solve_button_rect.collidepoint(mouse_cor):
-                self.solve_sudoku_board(self.grid)
+            if self.layout.solve_button_rect.collidepoint(mouse_cor):
+                self.solve_sudoku_board()
+
+    def can_enter(self, row, col):
+        """Returns True if the cell accepts a digit, or a note while notes mode is on"""
+        return self.session.can_enter(row, col)
 
     def new_game_clicked(self, mouse_cor):
-        if self.new_game_rect.collidepoint(mouse_cor):
+        if self.layout.new_game_rect.collidepoint(mouse_cor):
+            self.session.cancel_solve()  # Cancel a running auto-solve
             return True
 
     def difficulty_selected(self, mouse_cor):
         """Detects the difficulty selected from menu buttons"""
-        for difficulty in self.menu_buttons:
-            if self.menu_buttons[difficulty].collidepoint(mouse_cor):
-                self.difficulty = difficulty
-                return True
-
-    def solve_sudoku_board(self, grid):
-        """Solves sudoku board when the solve_button is clicked."""
-        self.selected_cell = self.highlighted_cell = None
-
-        empty_cell = self.game.find_empty_cell(grid)
-
-        if not empty_cell:
-            self.auto_solve = True
-            self.game_end = True
-            self.end_time = pygame.time.get_ticks()
+        difficulty = self.layout.menu_button_at(mouse_cor)
+        if difficulty:
+            self.difficulty = difficulty
             return True
 
-        row, col = empty_cell
+    def solve_sudoku_board(self):
+        """Starts the auto-solve animation when the solve_button is clicked.
 
-        grid[row][col] = self.game.solutions[0][row][col]
+        Cells are filled one per step from the main loop (see step_auto_solve), so the event loop
+        keeps running and New Game can cancel the animation. A step time of 0 fills the board at once.
+        """
+        self.selected_cell = self.highlighted_cell = None
+        self.session.start_solve()
 
-        self.draw_grid(grid)
-        pygame.display.flip()
-        pygame.time.wait(20)
+    def step_auto_solve(self):
+        """Fills the next empty cell if a solve step is due. Returns True while the animation runs"""
+        if not self.solving:
+            return False
 
-        self.solve_sudoku_board(grid)
+        # Only a filled cell or the end of the animation needs a new frame
+        filled = self.board.filled
+        running = self.session.step_auto_solve()
+        if self.board.filled != filled or not running:
+            self.dirty = True
+        return running
 
-    def wrong_entry(self):
-        """Deducts a life when the user makes a wrong entry"""
-        self.current_lives -= 1
-        if self.current_lives <= 0:
-            self.game_end = True
-            self.end_time = pygame.time.get_ticks()
+    def ms_until_solve_step(self):
+        return self.session.ms_until_solve_step()
 
     def handle_num_input(self, row, col, num):
-        """Validates num inputs and stores note inputs as strings"""
-        if self.notes_mode:
-            if isinstance(self.grid[row][col], str):  # Check if cell already has notes i.e. is str type
-                if str(num) not in self.grid[row][col]:
-                    self.grid[row][col] += str(num)
-                else:
-                    # Delete existing note if same note is clicked again
-                    self.grid[row][col] = self.grid[row][col].replace(str(num), '')
-            else:
-                # If empty cell, just add note
-                self.grid[row][col] = str(num)
+        """Passes a digit or note entry to the session; losing a life or winning ends the game there
+
+        The results box is drawn by draw_grid once the session reports the game has ended.
+        """
+        self.session.enter(row, col, num)
+
+    def autosave(self):
+        """Queues a save if the game changed since the last one; ended or auto-solved games drop theirs
+
+        Comparing the board planes costs a few microseconds, and the write happens on the
+        autosave thread, so this is safe to call on every pass of the main loop.
+        """
+        if self.autosaver is None or self.board is None:
+            return
+
+        if self.game_end or self.solve_started:
+            if self.saved_state != 'ended':
+                self.autosaver.delete()
+                self.saved_state = 'ended'
+            return
+
+        state = self.session.state_key()
+        if state != self.saved_state:
+            self.saved_state = state
+            self.autosaver.save(encode_snapshot(self.session.snapshot()))
+
+    def close_autosave(self):
+        """Saves the game in progress with its final elapsed time and waits for the disk"""
+        if self.autosaver is None:
+            return
+
+        self.saved_state = None
+        self.autosave()
+        self.autosaver.close()
+
+    def resume_saved_game(self):
+        """Restores the last saved game, if any. Returns True when a game was resumed"""
+        snapshot = load_snapshot(self.save_path) if self.save_path else None
+        if snapshot is None:
+            return False
+
+        self.session.restore(snapshot)
+        self.reset_view(snapshot.difficulty)
+        return True
 
+    def start_new_game(self, difficulty):
+        """Starts a game with the daily puzzle in daily mode, else a pre-generated one from the bank or pool"""
+        fetch_start = instruments.enabled and time.perf_counter()
+        if self.daily:
+            puzzle, solution = daily_puzzle(difficulty)
         else:
-            # Validate num inputs with solution grid
-            if num == self.game.solutions[0][row][col]:
-                self.grid[row][col] = num
-            else:
-                self.grid[row][col] = -num
-                self.wrong_entry()
+            banked = self.puzzle_bank.random_puzzle(difficulty) if self.puzzle_bank else None
+            puzzle, solution = banked or self.puzzle_pool.get(difficulty)
+        if fetch_start:
+            instruments.record('puzzle_fetch', (time.perf_counter() - fetch_start) * 1000)
 
-            if self.game.is_solved(self.grid):
-                self.game_won = True
-                self.game_end = True
-                self.end_time = pygame.time.get_ticks()
-                self.display_results()
+        self.session.start(difficulty, puzzle, solution)
+        self.reset_view(difficulty)
 
-    def start_new_game(self, difficulty):
-        """Resets instance attributes and initializes new game"""
+    def reset_view(self, difficulty):
+        """Clears selection, messages and cached layers for a newly started or resumed game"""
         self.difficulty = difficulty
-        self.start_time = pygame.time.get_ticks()
-        self.end_time = None
-        self.current_lives = 4
-        self.game_end = False
-        self.game_won = False
-        self.auto_solve = False
-        self.notes_mode = False
         self.freeze_screen = False
         self.selected_cell = False
+        self.hint_text = None
+        self.saved_state = None
 
-        # Generate new Sudoku puzzle
-        self.game = SudokuGame()
-        self.sudoku_board = self.game.generate_puzzle(self.difficulty)
-        self.grid = copy.deepcopy(self.sudoku_board)
+        # The difficulty label lives in the static layer, so rebuild it for the new game
+        self.board_layer = None
@@ -0,0 +1,186 @@
+"""Hint engine: finds the next logical move with ranked human solving techniques"""
+from collections import namedtuple
+
+from sudoku_solver import BOX_OF, COL_OF, DIGIT_OF_BIT, FULL_MASK, PEERS, ROW_OF, UNITS, split_bits
+
+# Ranked from easiest to hardest; a hint reports the hardest technique it needed
+TECHNIQUES = ("naked single", "hidden single", "pointing pair", "naked pair", "x-wing")
+
+ROWS = UNITS[:9]
+COLS = UNITS[9:18]
+BOXES = UNITS[18:]
+
+Hint = namedtuple("Hint", "row col digit technique")
+
+
+class HintEngine:
+    """Candidate masks for the 81 cells, kept in step with the board between hint calls
+
+    Placed digits are folded in incrementally, and eliminations found by the harder techniques
+    stay in the candidate state, so a later call starts where the last one stopped. Only a
+    cleared digit forces a rebuild.
+    """
+
+    def __init__(self):
+        self.values = bytearray(81)
+        self.candidates = [FULL_MASK] * 81
+
+    def reset(self, values):
+        self.values = bytearray(81)
+        self.candidates = [FULL_MASK] * 81
+        for index, value in enumerate(values):
+            if value:
+                self.place(index, value)
+
+    def sync(self, values):
+        """Brings the state up to date with the board's filled digits (0 for open cells)"""
+        if self.values == values:
+            return
+
+        for index, value in enumerate(values):
+            current = self.values[index]
+            if current == value:
+                continue
+            if current:
+                # A digit was removed or replaced; earlier eliminations may no longer hold
+                self.reset(values)
+                return
+            self.place(index, value)
+
+    def place(self, index, digit):
+        self.values[index] = digit
+        self.candidates[index] = 0
+        keep = ~(1 << (digit - 1))
+        candidates = self.candidates
+        for peer in PEERS[index]:
+            candidates[peer] &= keep
+
+    def eliminate(self, cells, bit):
+        """Removes a candidate bit from the given cells. Returns True if any cell changed"""
+        changed = False
+        candidates = self.candidates
+        for index in cells:
+            if candidates[index] & bit:
+                candidates[index] &= ~bit
+                changed = True
+        return changed
+
+    def naked_single(self):
+        for index, mask in enumerate(self.candidates):
+            if mask and not mask & (mask - 1):
+                return index, DIGIT_OF_BIT[mask]
+        return None
+
+    def hidden_single(self):
+        candidates = self.candidates
+        for unit in UNITS:
+            seen_once = seen_twice = 0
+            for index in unit:
+                mask = candidates[index]
+                seen_twice |= seen_once & mask
+                seen_once |= mask
+
+            hidden = seen_once & ~seen_twice
+            if hidden:
+                bit = hidden & -hidden
+                for index in unit:
+                    if candidates[index] & bit:
+                        return index, DIGIT_OF_BIT[bit]
+        return None
+
+    def pointing_pairs(self):
+        """A digit confined to one row or column of a box is removed from the rest of that line"""
+        candidates = self.candidates
+        for box, box_cells in enumerate(BOXES):
+            for bit in split_bits(FULL_MASK):
+                cells = [index for index in box_cells if candidates[index] & bit]
+                if len(cells) < 2:
+                    continue
+
+                rows = {ROW_OF[index] for index in cells}
+                if len(rows) == 1:
+                    line = [index for index in ROWS[rows.pop()] if BOX_OF[index] != box]
+                    if self.eliminate(line, bit):
+                        return True
+
+                cols = {COL_OF[index] for index in cells}
+                if len(cols) == 1:
+                    line = [index for index in COLS[cols.pop()] if BOX_OF[index] != box]
+                    if self.eliminate(line, bit):
+                        return True
+        return False
+
+    def naked_pairs(self):
+        """Two cells of a unit sharing the same two candidates remove them from the unit's other cells"""
+        candidates = self.candidates
+        for unit in UNITS:
+            pairs = {}
+            for index in unit:
+                mask = candidates[index]
+                if mask.bit_count() == 2:
+                    pairs.setdefault(mask, []).append(index)
+
+            for mask, cells in pairs.items():
+                if len(cells) != 2:
+                    continue
+                others = [index for index in unit if index not in cells]
+                changed = False
+                for bit in split_bits(mask):
+                    changed |= self.eliminate(others, bit)
+                if changed:
+                    return True
+        return False
+
+    def x_wing(self):
+        """A digit limited to the same two columns in two rows is removed from those columns elsewhere
+
+        The same check runs with rows and columns swapped.
+        """
+        candidates = self.candidates
+        for lines, cross_lines, line_of, position in ((ROWS, COLS, ROW_OF, COL_OF), (COLS, ROWS, COL_OF, ROW_OF)):
+            for bit in split_bits(FULL_MASK):
+                seen = {}
+                for line_number, line in enumerate(lines):
+                    spots = tuple(position[index] for index in line if candidates[index] & bit)
+                    if len(spots) != 2:
+                        continue
+
+                    if spots in seen:
+                        wing_lines = (seen[spots], line_number)
+                        changed = False
+                        for spot in spots:
+                            cross = [index for index in cross_lines[spot] if line_of[index] not in wing_lines]
+                            changed |= self.eliminate(cross, bit)
+                        if changed:
+                            return True
+                    else:
+                        seen[spots] = line_number
+        return False
+
+    def next_move(self, values):
+        """Returns the next deducible placement as a Hint, or None if the techniques run out
+
+        values are the board's filled digits, 0 for open cells.
+        """
+        self.sync(values)
+        eliminations = (self.pointing_pairs, self.naked_pairs, self.x_wing)
+        hardest = 0
+
+        while True:
+            single = self.naked_single()
+            rank = 0
+            if single is None:
+                single = self.hidden_single()
+                rank = 1
+
+            if single is not None:
+                index, digit = single
+                return Hint(index // 9, index % 9, digit, TECHNIQUES[max(rank, hardest)])
+
+            # Apply the easiest elimination that makes progress, then look for singles again
+            for rank, technique in enumerate(eliminations, start=2):
+                if technique():
+                    hardest = max(hardest, rank)
+                    break
+            else:
+                return None
@@ -0,0 +1,118 @@
+"""Opt-in instrumentation: counters and timing samples for the hot paths, with a JSON trace dump
+
+Set SUDOKU_TRACE to a file path to record from startup and write the trace there on exit;
+F3 in game toggles the on-screen overlay, which also switches recording on.
+"""
+import functools
+import json
+import time
+from collections import deque
+
+
+class Instruments:
+    """Counters, recent timing samples and an optional trace, recorded only while enabled
+
+    Call sites test enabled before doing any work, so a disabled instance costs one
+    attribute lookup per instrumented call. Tight loops count into locals and report
+    once per call.
+    """
+
+    def __init__(self, window=240, trace_limit=100000):
+        self.enabled = False
+        self.window = window
+        self.counters = {}
+        self.samples = {}  # name -> recent values
+        self.stamps = {}  # name -> perf_counter time of those values, for rates
+        self.tracing = False
+        self.trace = deque(maxlen=trace_limit)
+        self.started = time.perf_counter()
+
+    def enable(self, trace=False):
+        self.enabled = True
+        self.tracing = self.tracing or trace
+
+    def disable(self):
+        self.enabled = False
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def record(self, name, value):
+        """Adds a sample, e.g. a duration in milliseconds"""
+        now = time.perf_counter()
+        if name not in self.samples:
+            self.samples[name] = deque(maxlen=self.window)
+            self.stamps[name] = deque(maxlen=self.window)
+        self.samples[name].append(value)
+        self.stamps[name].append(now)
+
+        if self.tracing:
+            self.trace.append((round(now - self.started, 6), name, value))
+
+    def last(self, name):
+        samples = self.samples.get(name)
+        return samples[-1] if samples else None
+
+    def percentile(self, name, percent):
+        """Returns a percentile of the recent samples of name, or None without samples"""
+        samples = self.samples.get(name)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    def mean(self, name):
+        samples = self.samples.get(name)
+        return sum(samples) / len(samples) if samples else None
+
+    def rate(self, name):
+        """Returns samples of name per second over the recent window, e.g. frames per second"""
+        stamps = self.stamps.get(name)
+        if not stamps or len(stamps) < 2 or stamps[-1] == stamps[0]:
+            return None
+        return (len(stamps) - 1) / (stamps[-1] - stamps[0])
+
+    def summary(self):
+        """Returns the counters and per-name sample statistics as plain data"""
+        timings = {
+            name: {
+                "last": self.last(name),
+                "mean": self.mean(name),
+                "p50": self.percentile(name, 50),
+                "p95": self.percentile(name, 95),
+                "p99": self.percentile(name, 99),
+                "samples": len(samples),
+            }
+            for name, samples in self.samples.items()
+        }
+        return {"counters": dict(self.counters), "timings": timings}
+
+    def dump(self, path):
+        """Writes the summary and the trace, as [seconds, name, value] rows, to a JSON file"""
+        data = self.summary()
+        data["trace"] = list(self.trace)
+        with open(path, "w") as file:
+            json.dump(data, file)
+
+
+instruments = Instruments()
+
+
+def timed(name):
+    """Decorator recording each call's duration in milliseconds under name while enabled"""
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not instruments.enabled:
+                return func(*args, **kwargs)
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                instruments.record(name, (time.perf_counter() - start) * 1000)
+
+        return wrapper
+
+    return decorate
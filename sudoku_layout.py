@@ -0,0 +1,62 @@
+"""Screen geometry for SudokuUI, computed once so hit tests are simple lookups"""
+import pygame
+
+
+class BoardLayout:
+    """Rects for every clickable element of the menu and board screens"""
+
+    def __init__(self, window_size=(720, 790), margin=90, size=9):
+        self.window_size = window_size
+        self.margin = margin
+        self.size = size
+
+        # The grid fills the width between the margins: 60px cells on a 9x9 board
+        self.cell_size = cell_size = (window_size[0] - 2 * margin) // size
+        self.grid_extent = cell_size * size
+
+        self.cell_rects = [
+            [pygame.Rect(margin + col * cell_size, margin + row * cell_size, cell_size, cell_size)
+             for col in range(size)]
+            for row in range(size)
+        ]
+
+        # Number pad: a button per digit along the bottom, spread over 0.86 of the grid width
+        self.num_pitch = 0.86 * self.grid_extent / size
+        button_size = min(30, int(self.num_pitch) - 2)
+        self.num_button_rects = [
+            pygame.Rect(margin + num * self.num_pitch, window_size[1] - 130, button_size, button_size)
+            for num in range(1, size + 1)
+        ]
+
+        self.new_game_rect = pygame.Rect(530, 5, 100, 30)
+        self.solve_button_rect = pygame.Rect(90, 50, 80, 35)
+        self.del_button_rect = pygame.Rect(380, 710, 70, 30)
+        self.notes_button_rect = pygame.Rect(290, 710, 70, 30)
+        self.auto_notes_rect = pygame.Rect(470, 710, 70, 30)
+
+        self.menu_buttons = {
+            'Easy': pygame.Rect(285, 290, 150, 30),
+            'Medium': pygame.Rect(285, 330, 150, 30),
+            'Expert': pygame.Rect(285, 370, 150, 30),
+        }
+
+    def cell_at(self, pos):
+        """Returns the (row, col) under a screen position, or None outside the grid"""
+        x, y = pos
+        end = self.margin + self.grid_extent
+        if self.margin < x < end and self.margin < y < end:
+            return (y - self.margin) // self.cell_size, (x - self.margin) // self.cell_size
+
+    def num_button_at(self, pos):
+        """Returns the number pad digit under a screen position, or None"""
+        # Rect positions are truncated to whole pixels, so the hit is this slot or the next one
+        slot = int((pos[0] - self.margin) // self.num_pitch)
+        for num in (slot, slot + 1):
+            if 1 <= num <= self.size and self.num_button_rects[num - 1].collidepoint(pos):
+                return num
+
+    def menu_button_at(self, pos):
+        """Returns the difficulty of the menu button under a screen position, or None"""
+        for difficulty, rect in self.menu_buttons.items():
+            if rect.collidepoint(pos):
+                return difficulty
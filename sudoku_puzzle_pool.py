@@ -0,0 +1,86 @@
+"""Keeps ready-made puzzles for each difficulty, generated by background worker processes"""
+import multiprocessing
+import os
+import time
+from collections import deque
+
+from sudoku_game_logic import SudokuGame
+from sudoku_instruments import instruments
+
+DIFFICULTIES = ("Easy", "Medium", "Expert")
+
+
+def generate_puzzle_with_solution(difficulty, size=9):
+    """Generates one puzzle and returns (puzzle, solution, milliseconds spent generating)"""
+    start = time.perf_counter()
+    game = SudokuGame(size=size)
+    puzzle = game.generate_puzzle(difficulty)
+    return puzzle, game.solutions[0], (time.perf_counter() - start) * 1000
+
+
+class PuzzlePool:
+    """Per-difficulty stock of pending puzzle generations, topped up as puzzles are taken
+
+    A depth of 0 disables the workers and every request is generated synchronously. Puzzles
+    are size x size, 9x9 by default.
+    """
+
+    def __init__(self, depth=2, workers=None, difficulties=DIFFICULTIES, size=9):
+        self.depth = depth
+        self.size = size
+        self.stock = {difficulty: deque() for difficulty in difficulties}
+        self.workers = None
+
+        if depth > 0:
+            workers = workers or min(2, os.cpu_count() or 1)
+
+            # Spawn rather than fork so workers never inherit the parent's SDL state
+            self.workers = multiprocessing.get_context("spawn").Pool(workers)
+            for difficulty in difficulties:
+                for _ in range(depth):
+                    self._submit(difficulty)
+
+    def _submit(self, difficulty):
+        if self.workers is not None:
+            result = self.workers.apply_async(generate_puzzle_with_solution, (difficulty, self.size))
+            self.stock[difficulty].append(result)
+
+    def ready_count(self, difficulty):
+        """Returns how many puzzles of a difficulty can be served without waiting"""
+        return sum(result.ready() for result in self.stock.get(difficulty, ()))
+
+    def get(self, difficulty):
+        """Returns a (puzzle, solution) pair, generating one in-process if none is ready"""
+        puzzle, solution, generation_ms = self._take(difficulty)
+        if instruments.enabled:
+            # Worker processes keep their own instruments, so the time travels with the puzzle
+            instruments.record("puzzle_generation", generation_ms)
+        return puzzle, solution
+
+    def _take(self, difficulty):
+        pending = self.stock.get(difficulty)
+
+        if pending:
+            # A slot whose worker died never becomes ready and is skipped like one still generating
+            for result in list(pending):
+                if not result.ready():
+                    continue
+
+                # Replace every finished slot, including ones whose generation raised
+                pending.remove(result)
+                self._submit(difficulty)
+                if result.successful():
+                    return result.get()
+
+        return generate_puzzle_with_solution(difficulty, self.size)
+
+    def close(self):
+        """Cancels queued generations and kills the worker processes without waiting for them
+
+        A worker can be minutes into a large board, so quitting must not wait for it to finish.
+        """
+        if self.workers is not None:
+            self.workers.terminate()
+            self.workers = None
+            for pending in self.stock.values():
+                pending.clear()
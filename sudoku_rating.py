@@ -0,0 +1,48 @@
+"""Difficulty rating: grades a puzzle by the hardest technique a logical solver needs"""
+from collections import namedtuple
+
+from sudoku_hints import TECHNIQUES, HintEngine
+
+# Rating levels in order; a puzzle the techniques cannot finish needs guessing
+LEVELS = TECHNIQUES + ("guessing",)
+GUESSING = len(TECHNIQUES)
+
+# rank is the index into LEVELS; steps counts the placements the logical solver made
+Rating = namedtuple("Rating", "rank technique steps")
+
+# Hardest-technique rank range accepted for each difficulty
+DIFFICULTY_BANDS = {
+    "Easy": (0, 0),  # naked singles only
+    "Medium": (1, 1),  # needs hidden singles
+    "Expert": (2, GUESSING - 1),  # needs an elimination technique, but never a guess
+}
+
+
+def rate_puzzle(grid):
+    """Solves a 9x9 puzzle step by step with the hint engine and returns its Rating"""
+    values = bytearray(value for row in grid for value in row)
+    engine = HintEngine()
+    rank = steps = 0
+
+    while True:
+        hint = engine.next_move(values)
+        if hint is None:
+            break
+        values[hint.row * 9 + hint.col] = hint.digit
+        rank = max(rank, TECHNIQUES.index(hint.technique))
+        steps += 1
+
+    if not all(values):
+        rank = GUESSING
+    return Rating(rank, LEVELS[rank], steps)
+
+
+def in_band(rating, difficulty):
+    low, high = DIFFICULTY_BANDS[difficulty]
+    return low <= rating.rank <= high
+
+
+def band_distance(rating, difficulty):
+    """How many levels a rating falls outside a difficulty's band, 0 inside it"""
+    low, high = DIFFICULTY_BANDS[difficulty]
+    return max(low - rating.rank, rating.rank - high, 0)
@@ -0,0 +1,348 @@
+"""Input recording and headless replay, for load-testing the game loop and catching leaks
+
+Record a session by playing with SUDOKU_RECORD set to a file path:
+    SUDOKU_RECORD=session.jsonl python main.py
+
+Usage: python sudoku_replay.py replay FILE                  (replays a recording at full speed)
+       python sudoku_replay.py synth [--events N] [--seed S] [--save FILE]
+                                                            (generates and replays a random session)
+
+A recording is JSON lines: one per mouse click, key press or quit, stamped with milliseconds
+since recording began, and one per game started holding its board size, puzzle and solution
+as flat digit lists, so a replay plays the same puzzles without generating any. A game resumed
+from a save is recorded as its save snapshot (see sudoku_save) in hex.
+"""
+import argparse
+import json
+import os
+import random
+import time
+import tracemalloc
+
+from sudoku_save import decode_snapshot, encode_snapshot
+
+
+class EventRecorder:
+    """Appends the events main.run handles, and the games they start, to a recording file"""
+
+    def __init__(self, path):
+        import pygame
+
+        self.pygame = pygame
+        self.file = open(path, "w")
+        self.started = time.perf_counter()
+
+    def now(self):
+        return int((time.perf_counter() - self.started) * 1000)
+
+    def write(self, entry):
+        self.file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def record(self, event):
+        """Writes a mouse button, key or quit event; anything else cannot change the game"""
+        entry = event_entry(self.pygame, event)
+        if entry:
+            entry["t"] = self.now()
+            self.write(entry)
+
+    def record_game(self, session, resumed=False):
+        """Writes the puzzle of a game just started, or the position of one resumed from a save
+
+        Saves only hold 9x9 games, so only resumed games are written as snapshots.
+        """
+        if resumed:
+            self.write({"t": self.now(), "type": "game", "resumed": True,
+                        "snapshot": encode_snapshot(session.snapshot()).hex()})
+        else:
+            self.write(game_entry(self.now(), session.difficulty, session.game.grid, session.game.solutions[0]))
+
+    def close(self):
+        self.file.close()
+
+
+def event_entry(pygame, event):
+    """Returns a recording entry for a pygame event, or None for events that are not recorded"""
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return {"type": "mouse", "pos": list(event.pos), "button": event.button}
+    if event.type == pygame.KEYDOWN:
+        return {"type": "key", "key": event.key, "mod": event.mod, "unicode": event.unicode}
+    if event.type == pygame.QUIT:
+        return {"type": "quit"}
+    return None
+
+
+def game_entry(t, difficulty, puzzle, solution):
+    """Returns the recording entry of a new game on a square puzzle of any size"""
+    return {"t": t, "type": "game", "resumed": False, "difficulty": difficulty, "size": len(puzzle),
+            "puzzle": [value for row in puzzle for value in row],
+            "solution": [value for row in solution for value in row]}
+
+
+def entry_grids(entry):
+    """Returns the (puzzle, solution) grids of a new game entry"""
+    size = entry["size"]
+    return tuple([values[row * size:row * size + size] for row in range(size)]
+                 for values in (entry["puzzle"], entry["solution"]))
+
+
+def entry_event(pygame, entry):
+    """Rebuilds the pygame event of a recording entry"""
+    if entry["type"] == "mouse":
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=tuple(entry["pos"]), button=entry["button"])
+    if entry["type"] == "key":
+        return pygame.event.Event(pygame.KEYDOWN, key=entry["key"], mod=entry["mod"], unicode=entry["unicode"])
+    return pygame.event.Event(pygame.QUIT)
+
+
+def load_recording(path):
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class RecordedPuzzles:
+    """Stands in for a PuzzleBank, handing out a recording's new games in the order they were played"""
+
+    def __init__(self, games):
+        self.games = list(reversed(games))
+
+    def random_puzzle(self, difficulty):
+        if not self.games:
+            return None  # The UI falls back to generating one
+        return self.games.pop()
+
+    def close(self):
+        pass
+
+
+def percentiles(samples):
+    """Returns (mean, p50, p95, p99, max) of a list of durations"""
+    if not samples:
+        return (0,) * 5
+    ordered = sorted(samples)
+
+    def at(percent):
+        return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+    return sum(ordered) / len(ordered), at(50), at(95), at(99), ordered[-1]
+
+
+def cache_sizes(ui):
+    """Sizes of the containers a long session could grow without bound"""
+    return {
+        "cell_cache": len(ui.cell_cache),
+        "glyphs": len(ui.glyphs.surfaces),
+        "update_rects": len(ui.update_rects),
+        "dynamic_rects": len(ui.previous_dynamic_rects),
+        "undo": len(ui.history.undo_stack),
+        "redo": len(ui.history.redo_stack),
+    }
+
+
+def traced_bytes():
+    """Returns the bytes traced by tracemalloc, leaving out this module's own timing samples"""
+    snapshot = tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, __file__)])
+    return sum(stat.size for stat in snapshot.statistics("filename"))
+
+
+def replay(entries, checkpoint_every=1000, trace_memory=True):
+    """Feeds a recording through main.handle_event and main.draw_frame as fast as they run
+
+    Runs under the SDL dummy driver with the pool, bank and autosave off, and auto-solve
+    filling the board at once. Returns a dict of per-event handling times by event type,
+    frame times, and (events, traced bytes, cache sizes) checkpoints for spotting growth.
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+    import pygame
+    from main import draw_frame, handle_event
+    from sudoku_gui import SudokuUI
+
+    games = [entry for entry in entries if entry["type"] == "game"]
+    size = next((entry["size"] for entry in games if not entry["resumed"]), 9)
+
+    ui = SudokuUI(pool_depth=0, bank_path=None, solve_step_ms=0, save_path=None, size=size)
+    new_games = []
+    showing_menu = True
+    for entry in games:
+        if entry["resumed"]:
+            snapshot = decode_snapshot(bytes.fromhex(entry["snapshot"]))
+            ui.session.restore(snapshot)
+            ui.reset_view(snapshot.difficulty)
+            showing_menu = False
+        else:
+            new_games.append(entry_grids(entry))
+    ui.puzzle_bank = RecordedPuzzles(new_games)
+
+    if trace_memory:
+        tracemalloc.start()
+
+    latencies = {}
+    frames = []
+    checkpoints = []
+    handled = 0
+    start = time.perf_counter()
+
+    for entry in entries:
+        if entry["type"] == "game":
+            continue
+        if entry["type"] == "quit":
+            break
+
+        event = entry_event(pygame, entry)
+        event_start = time.perf_counter()
+        showing_menu = handle_event(ui, event, showing_menu)
+        if not showing_menu:
+            ui.step_auto_solve()
+        latencies.setdefault(entry["type"], []).append((time.perf_counter() - event_start) * 1000)
+
+        if ui.dirty:
+            frame_start = time.perf_counter()
+            draw_frame(ui, showing_menu)
+            frames.append((time.perf_counter() - frame_start) * 1000)
+
+        handled += 1
+        if handled % checkpoint_every == 0:
+            traced = traced_bytes() if trace_memory else None
+            checkpoints.append((handled, traced, cache_sizes(ui)))
+
+    elapsed = time.perf_counter() - start
+    if trace_memory:
+        tracemalloc.stop()
+
+    ui.puzzle_pool.close()
+    pygame.quit()
+
+    recorded = entries[-1]["t"] if entries else 0
+    return {"events": handled, "elapsed": elapsed, "recorded_ms": recorded, "latencies": latencies,
+            "frames": frames, "checkpoints": checkpoints}
+
+
+def synthesize(count, seed=None, difficulties=("Easy", "Medium", "Expert")):
+    """Returns a recording of count random clicks and key presses, as a long erratic session would make
+
+    Play is blind to the board: cells, digits, notes, hints, undo and redo are picked at random,
+    so some moves are wrong and some games are lost, and a new game starts every few hundred
+    events. Puzzles come from transformed seeds (see sudoku_transform), a game entry per game.
+    """
+    import pygame
+    from sudoku_game_logic import SudokuGame
+    from sudoku_layout import BoardLayout
+
+    rng = random.Random(seed)
+    random.seed(seed)
+    layout = BoardLayout()
+    generator = SudokuGame(generation_mode="transform")
+    entries = []
+    t = 0
+
+    def click(rect):
+        entries.append({"t": t, "type": "mouse", "button": 1,
+                        "pos": [rng.randrange(rect.left, rect.right), rng.randrange(rect.top, rect.bottom)]})
+
+    def key(code, mod=0, unicode=""):
+        entries.append({"t": t, "type": "key", "key": code, "mod": mod, "unicode": unicode})
+
+    def new_game():
+        difficulty = rng.choice(difficulties)
+        generator.generate_puzzle(difficulty)
+        entries.append(game_entry(t, difficulty, generator.grid, generator.solutions[0]))
+        click(layout.menu_buttons[difficulty])
+
+    new_game()
+    while len(entries) < count:
+        t += rng.randrange(50, 1500)
+        roll = rng.random()
+
+        if roll < 0.003:
+            click(layout.new_game_rect)
+            new_game()
+        elif roll < 0.004:
+            click(layout.solve_button_rect)
+        elif roll < 0.35:
+            click(layout.cell_rects[rng.randrange(9)][rng.randrange(9)])
+        elif roll < 0.55:
+            click(layout.num_button_rects[rng.randrange(9)])
+        elif roll < 0.75:
+            digit = rng.randrange(1, 10)
+            key(pygame.K_0 + digit, unicode=str(digit))
+        elif roll < 0.8:
+            key(pygame.K_BACKSPACE, unicode="\b")
+        elif roll < 0.85:
+            click(layout.notes_button_rect)
+        elif roll < 0.87:
+            click(layout.auto_notes_rect)
+        elif roll < 0.88:
+            click(layout.del_button_rect)
+        elif roll < 0.92:
+            key(pygame.K_h, unicode="h")
+        elif roll < 0.96:
+            key(pygame.K_z, pygame.KMOD_LCTRL)
+        elif roll < 0.99:
+            key(pygame.K_y, pygame.KMOD_LCTRL)
+        else:
+            key(pygame.K_F3)
+
+    entries.append({"t": t, "type": "quit"})
+    return entries
+
+
+def print_report(result):
+    print(f"{result['events']} events replayed in {result['elapsed']:.2f}s "
+          f"({result['events'] / result['elapsed']:,.0f} events/sec; "
+          f"recorded over {result['recorded_ms'] / 1000:,.0f}s)")
+
+    print(f"{'handling ms':<14} {'count':>7} {'mean':>7} {'p50':>7} {'p95':>7} {'p99':>7} {'max':>7}")
+    rows = [(kind, samples) for kind, samples in sorted(result["latencies"].items())]
+    rows.append(("frame", result["frames"]))
+    for name, samples in rows:
+        stats = " ".join(f"{value:>7.3f}" for value in percentiles(samples))
+        print(f"{name:<14} {len(samples):>7} {stats}")
+    print(f"total frame cost {sum(result['frames']):.0f} ms over {len(result['frames'])} frames")
+
+    checkpoints = result["checkpoints"]
+    if not checkpoints:
+        return
+
+    print(f"{'events':>8} {'traced KiB':>11}  caches")
+    for events, traced, sizes in checkpoints:
+        traced = "-" if traced is None else f"{traced / 1024:.0f}"
+        print(f"{events:>8} {traced:>11}  " + " ".join(f"{name}={size}" for name, size in sizes.items()))
+
+    # Growth across the second half, after caches have had the first half to warm up
+    half = checkpoints[len(checkpoints) // 2:]
+    if len(half) >= 2 and half[0][1] is not None:
+        growth = (half[-1][1] - half[0][1]) / (half[-1][0] - half[0][0]) * 1000
+        print(f"traced memory growth over the second half: {growth / 1024:+.1f} KiB per 1000 events")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    replay_parser = commands.add_parser("replay", help="replay a recording")
+    replay_parser.add_argument("path")
+
+    synth_parser = commands.add_parser("synth", help="generate and replay a random session")
+    synth_parser.add_argument("--events", type=int, default=20000)
+    synth_parser.add_argument("--seed", type=int, default=2024)
+    synth_parser.add_argument("--save", help="also write the generated recording here")
+
+    for command in (replay_parser, synth_parser):
+        command.add_argument("--checkpoint", type=int, default=1000, help="events between memory checkpoints")
+        command.add_argument("--no-memory", action="store_true", help="skip tracemalloc, for undisturbed timings")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "replay":
+        entries = load_recording(args.path)
+    else:
+        entries = synthesize(args.events, args.seed)
+        if args.save:
+            with open(args.save, "w") as file:
+                file.writelines(json.dumps(entry, separators=(",", ":")) + "\n" for entry in entries)
+
+    print_report(replay(entries, args.checkpoint, not args.no_memory))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Compact binary save games, written atomically from a background thread
+
+File layout (little-endian):
+    header      magic b"SDKS", version u16, difficulty code u8, lives u8, flags u8,
+                elapsed milliseconds u32
+    board       values and solution packed at 4 bits per cell (41 bytes each), the status
+                plane (81 bytes) and the notes plane (81 u16)
+    checksum    CRC-32 of everything above, so a torn or corrupt file is ignored
+"""
+import os
+import struct
+import sys
+import threading
+import zlib
+from array import array
+from collections import namedtuple
+
+from sudoku_bank import DIFFICULTIES, PACKED_GRID_SIZE, pack_cells, unpack_grid
+
+MAGIC = b"SDKS"
+VERSION = 1
+HEADER = struct.Struct("<4sHBBBI")
+CHECKSUM = struct.Struct("<I")
+NOTES_MODE = 0x01
+
+SNAPSHOT_SIZE = HEADER.size + 2 * PACKED_GRID_SIZE + 81 + 162 + CHECKSUM.size
+
+Snapshot = namedtuple("Snapshot", "difficulty lives notes_mode elapsed_ms values status notes solution")
+
+
+def encode_snapshot(snapshot):
+    """Serializes a Snapshot to bytes"""
+    notes = array("H", snapshot.notes)
+    if sys.byteorder == "big":
+        notes.byteswap()
+
+    flags = NOTES_MODE if snapshot.notes_mode else 0
+    data = b"".join((
+        HEADER.pack(MAGIC, VERSION, DIFFICULTIES.index(snapshot.difficulty), snapshot.lives, flags,
+                    snapshot.elapsed_ms),
+        pack_cells(snapshot.values),
+        pack_cells(value for row in snapshot.solution for value in row),
+        bytes(snapshot.status),
+        notes.tobytes(),
+    ))
+    return data + CHECKSUM.pack(zlib.crc32(data))
+
+
+def decode_snapshot(data):
+    """Parses bytes from encode_snapshot. Returns None if they are not an intact snapshot"""
+    if len(data) != SNAPSHOT_SIZE:
+        return None
+
+    body, (checksum,) = data[:-CHECKSUM.size], CHECKSUM.unpack_from(data, len(data) - CHECKSUM.size)
+    if zlib.crc32(body) != checksum:
+        return None
+
+    magic, version, difficulty, lives, flags, elapsed_ms = HEADER.unpack_from(body, 0)
+    if magic != MAGIC or version != VERSION or difficulty >= len(DIFFICULTIES):
+        return None
+
+    offset = HEADER.size
+    values = bytearray(value for row in unpack_grid(body[offset:offset + PACKED_GRID_SIZE]) for value in row)
+    offset += PACKED_GRID_SIZE
+    solution = unpack_grid(body[offset:offset + PACKED_GRID_SIZE])
+    offset += PACKED_GRID_SIZE
+    status = bytearray(body[offset:offset + 81])
+    notes = array("H", body[offset + 81:])
+    if sys.byteorder == "big":
+        notes.byteswap()
+
+    return Snapshot(DIFFICULTIES[difficulty], lives, bool(flags & NOTES_MODE), elapsed_ms,
+                    values, status, notes, solution)
+
+
+def write_atomic(path, data):
+    """Writes data to a temporary file beside path, then renames it over path
+
+    A reader sees either the old file or the complete new one, never a partial write.
+    """
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(data)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def load_snapshot(path):
+    """Returns the Snapshot saved at path, or None if there is no intact save"""
+    try:
+        with open(path, "rb") as file:
+            return decode_snapshot(file.read())
+    except OSError:
+        return None
+
+
+class Autosaver:
+    """Writes save data on a background thread so the render loop never waits on the disk
+
+    Only the newest pending request is kept: saves submitted faster than the disk keeps up
+    replace each other, and close writes whatever is still pending before returning.
+    """
+
+    _DELETE = object()
+
+    def __init__(self, path):
+        self.path = path
+        self.pending = None
+        self.closed = False
+        self.errors = 0
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name="autosave", daemon=True)
+        self.thread.start()
+
+    def save(self, data):
+        """Queues snapshot bytes to be written"""
+        self._submit(data)
+
+    def delete(self):
+        """Queues removal of the save file, e.g. once its game has ended"""
+        self._submit(self._DELETE)
+
+    def _submit(self, request):
+        with self.condition:
+            self.pending = request
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closed:
+                    self.condition.wait()
+                request, self.pending = self.pending, None
+                if request is None:
+                    return
+
+            try:
+                if request is self._DELETE:
+                    if os.path.exists(self.path):
+                        os.remove(self.path)
+                else:
+                    write_atomic(self.path, request)
+            except OSError:
+                # A failed save must not take the game down; the next one will try again
+                self.errors += 1
+
+    def close(self):
+        """Writes any pending request and stops the thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
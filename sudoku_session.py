@@ -0,0 +1,259 @@
+"""Headless game session: the rules and state of one game, with no display and no pygame
+
+Usage: python sudoku_session.py [--sessions N] [--difficulty D] [--seed S]   (times random-play bots)
+"""
+import argparse
+import random
+import time
+
+from sudoku_board import EMPTY, GIVEN, WRONG, Board, History
+from sudoku_game_logic import SudokuGame
+from sudoku_save import Snapshot
+
+
+def monotonic_ms():
+    return int(time.monotonic() * 1000)
+
+
+class GameSession:
+    """Owns a game's board, history, lives, timer and win or loss, and every transition between them
+
+    Time comes from clock, a function returning milliseconds, so a driver can run sessions on
+    simulated time; the GUI passes pygame.time.get_ticks. Moves are validated against the
+    puzzle's solution as they are made, as in the original game.
+    """
+
+    def __init__(self, clock=monotonic_ms, solve_step_ms=20, history_depth=500, max_lives=4):
+        self.clock = clock
+        self.solve_step_ms = solve_step_ms
+        self.max_lives = max_lives
+        self.history = History(history_depth)
+
+        self.game = SudokuGame()
+        self.difficulty = None
+        self.board = None  # Player's Board (see sudoku_board); givens are marked in its status plane
+        self.current_lives = max_lives
+        self.notes_mode = False
+        self.auto_solve = False
+        self.game_won = False
+        self.game_end = False
+        self.start_time = clock()
+        self.end_time = None
+
+        # Auto-solve animation: one cell every solve_step_ms, advanced by step_auto_solve.
+        # solve_started stays set when the animation is cancelled, as the board is partly revealed
+        self.solving = False
+        self.solve_started = False
+        self.next_solve_step = 0
+
+    def start(self, difficulty, puzzle, solution):
+        """Begins a new game on a puzzle and its solution, square grids of any supported size"""
+        self.difficulty = difficulty
+        self.start_time = self.clock()
+        self.end_time = None
+        self.current_lives = self.max_lives
+        self.game_end = False
+        self.game_won = False
+        self.auto_solve = False
+        self.solving = False
+        self.solve_started = False
+        self.notes_mode = False
+
+        self.game = SudokuGame()
+        self.game.load(puzzle, solution)
+        self.board = self.game.board.copy()
+        self.history.clear()
+
+    def restore(self, snapshot):
+        """Continues a game from a Snapshot (see sudoku_save)"""
+        givens = [value if status == GIVEN else 0 for value, status in zip(snapshot.values, snapshot.status)]
+        self.start(snapshot.difficulty, [givens[row * 9:row * 9 + 9] for row in range(9)], snapshot.solution)
+
+        self.board = Board(snapshot.values, snapshot.notes, snapshot.status)
+        self.current_lives = snapshot.lives
+        self.notes_mode = snapshot.notes_mode
+        self.start_time = self.clock() - snapshot.elapsed_ms
+
+    def snapshot(self):
+        """Returns the game in progress as a Snapshot for saving; saves hold 9x9 games only"""
+        return Snapshot(self.difficulty, self.current_lives, self.notes_mode, self.elapsed_ms(),
+                        self.board.values, self.board.status, self.board.notes, self.game.solutions[0])
+
+    def state_key(self):
+        """Everything a save holds apart from the clock, for telling whether a save is due"""
+        return (bytes(self.board.values), bytes(self.board.status), self.board.notes.tobytes(),
+                self.current_lives, self.notes_mode)
+
+    def elapsed_ms(self):
+        """Returns the milliseconds elapsed in the current game, frozen once it ends"""
+        if not self.game_end:
+            return self.clock() - self.start_time
+        return self.end_time - self.start_time
+
+    def finish(self, won=False):
+        self.game_won = won
+        self.game_end = True
+        self.end_time = self.clock()
+
+    def can_enter(self, row, col):
+        """Returns True if the cell accepts a digit, or a note while notes mode is on"""
+        status = self.board.cell_status(row, col)
+        return status == EMPTY or (self.notes_mode and status == WRONG)
+
+    def toggle_notes_mode(self):
+        self.notes_mode = not self.notes_mode
+
+    def enter(self, row, col, num):
+        """Toggles a note in notes mode, or else places a digit, costing a life if it is wrong
+
+        Returns False for a wrong digit and True otherwise.
+        """
+        if self.notes_mode:
+            # Entering an existing note again removes it
+            self.history.apply(self.board, self.board.toggle_note, row, col, num)
+            return True
+
+        # Validate num inputs with solution grid
+        correct = num == self.game.solution_digit(row, col)
+        self.history.apply(self.board, self.board.place, row, col, num, correct)
+        if not correct:
+            self.wrong_entry()
+
+        if self.game.is_solved(self.board):
+            self.finish(won=True)
+        return correct
+
+    def wrong_entry(self):
+        """Deducts a life; the game is lost when none are left"""
+        self.current_lives -= 1
+        if self.current_lives <= 0:
+            self.finish()
+
+    def clear_cell(self, row, col):
+        """Deletes the player's digit or notes from a cell; givens are left alone"""
+        self.history.apply(self.board, self.board.clear, row, col)
+
+    def fill_notes(self):
+        """Fills every empty cell's notes with its legal candidates as one undoable move"""
+        self.history.apply(self.board, self.board.fill_candidates)
+
+    def hint(self):
+        """Fills in the next logically deducible cell
+
+        Returns the Hint, or None if the position needs guessing or no game is being played.
+        """
+        if self.game_end or self.solving:
+            return None
+
+        hint = self.game.hint(self.board)
+        if hint is not None:
+            self.history.apply(self.board, self.board.place, hint.row, hint.col, hint.digit, True)
+            if self.game.is_solved(self.board):
+                self.finish(won=True)
+        return hint
+
+    def undo(self):
+        """Reverts the last board change. Returns its (row, col), or None. Lives lost stay lost"""
+        if not self.game_end and not self.solving:
+            return self.history.undo(self.board)
+
+    def redo(self):
+        """Re-applies the last undone board change. Returns its (row, col), or None"""
+        if not self.game_end and not self.solving:
+            return self.history.redo(self.board)
+
+    def start_solve(self):
+        """Starts filling the board from the solution, one cell per step_auto_solve
+
+        A step time of 0 fills the board at once.
+        """
+        self.solving = True
+        self.solve_started = True
+        self.next_solve_step = self.clock()
+
+        if self.solve_step_ms <= 0:
+            while self.step_auto_solve():
+                pass
+
+    def cancel_solve(self):
+        self.solving = False
+
+    def step_auto_solve(self):
+        """Fills the next empty cell if a solve step is due. Returns True while the animation runs"""
+        if not self.solving:
+            return False
+
+        now = self.clock()
+        if now < self.next_solve_step and self.solve_step_ms > 0:
+            return True
+
+        empty_cell = self.board.first_open()
+        if not empty_cell:
+            self.solving = False
+            self.auto_solve = True
+            self.finish()
+            return False
+
+        row, col = empty_cell
+        self.history.apply(self.board, self.board.place, row, col, self.game.solution_digit(row, col), True)
+        self.next_solve_step = now + self.solve_step_ms
+
+        return True
+
+    def ms_until_solve_step(self):
+        return max(0, self.next_solve_step - self.clock())
+
+
+def play_random(session, rng=random):
+    """Plays a session to its end with random candidate digits, so some moves cost lives
+
+    Returns the number of moves made.
+    """
+    board = session.board
+    moves = 0
+    while not session.game_end:
+        row, col = board.first_open()
+        if board.cell_status(row, col) == WRONG:
+            session.clear_cell(row, col)
+
+        candidates = board.candidates(row * board.size + col)
+        digits = [digit for digit in range(1, board.size + 1) if candidates & (1 << (digit - 1))]
+        session.enter(row, col, rng.choice(digits))
+        moves += 1
+    return moves
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=2000)
+    parser.add_argument("--difficulty", default="Expert")
+    parser.add_argument("--seed", type=int, default=2024)
+    parser.add_argument("--size", type=int, default=9, help="board size: 4, 9, 16 or 25")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    random.seed(args.seed)
+
+    # Transformed seeds supply distinct puzzles fast enough not to dominate the timing; they
+    # exist for 9x9 boards only, so other sizes generate by search
+    generator = SudokuGame(generation_mode="transform" if args.size == 9 else "search", size=args.size)
+    puzzles = []
+    for _ in range(args.sessions):
+        generator.generate_puzzle(args.difficulty)
+        puzzles.append((generator.grid, generator.solutions[0]))
+
+    session = GameSession()
+    wins = moves = 0
+    start = time.perf_counter()
+    for puzzle, solution in puzzles:
+        session.start(args.difficulty, puzzle, solution)
+        moves += play_random(session, rng)
+        wins += session.game_won
+    elapsed = time.perf_counter() - start
+
+    print(f"{args.sessions} sessions, {moves} moves, {wins} won in {elapsed:.2f}s "
+          f"({args.sessions / elapsed:,.0f} sessions/sec, {moves / elapsed:,.0f} moves/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""Bitmask constraint-propagation engine behind the SudokuGame solving methods
+
+Grids are size x size with box x box subgrids, size being 4, 9, 16 or 25. The 9x9 geometry
+is also exported as module constants for the modules that only handle classic boards.
+"""
+import functools
+import math
+
+from sudoku_instruments import instruments
+
+SIZES = (4, 9, 16, 25)
+
+
+class Geometry:
+    """Precomputed cell geometry of a flat grid layout (index = row * size + col)"""
+
+    def __init__(self, size):
+        box = math.isqrt(size)
+        if size not in SIZES:
+            raise ValueError(f"unsupported board size {size}; expected one of {SIZES}")
+
+        self.size = size
+        self.box = box
+        self.cells = size * size
+        self.full_mask = (1 << size) - 1  # Bit (d - 1) is set for every digit d from 1 to size
+
+        self.row_of = tuple(index // size for index in range(self.cells))
+        self.col_of = tuple(index % size for index in range(self.cells))
+        self.box_of = tuple(box * (index // (size * box)) + (index % size) // box for index in range(self.cells))
+
+        self.units = (
+            tuple(tuple(row * size + col for col in range(size)) for row in range(size))
+            + tuple(tuple(row * size + col for row in range(size)) for col in range(size))
+            + tuple(
+                tuple(index for index in range(self.cells) if self.box_of[index] == unit)
+                for unit in range(size)
+            )
+        )
+
+        # The cells sharing a row, column or box with each cell (20 on a 9x9 board)
+        cell_units = [[] for _ in range(self.cells)]
+        for unit in self.units:
+            for index in unit:
+                cell_units[index].append(unit)
+        self.peers = tuple(
+            tuple(sorted({peer for unit in units for peer in unit} - {index}))
+            for index, units in enumerate(cell_units)
+        )
+
+        self.digit_of_bit = {1 << (digit - 1): digit for digit in range(1, size + 1)}
+
+
+@functools.lru_cache(maxsize=None)
+def geometry(size):
+    """Returns the shared Geometry of a board size"""
+    return Geometry(size)
+
+
+CLASSIC = geometry(9)
+FULL_MASK = CLASSIC.full_mask
+ROW_OF = CLASSIC.row_of
+COL_OF = CLASSIC.col_of
+BOX_OF = CLASSIC.box_of
+UNITS = CLASSIC.units
+PEERS = CLASSIC.peers
+DIGIT_OF_BIT = CLASSIC.digit_of_bit
+
+
+class SolverState:
+    """Grid values plus row, column and box digit masks kept in sync on every placement
+
+    This class holds 9x9 grids; state_class returns a subclass carrying another size's
+    geometry as class attributes, so the hot methods look it up the same way for every size.
+    """
+
+    __slots__ = ("cells", "rows", "cols", "boxes")
+
+    SIZE = 9
+    CELLS = 81
+    FULL_MASK = FULL_MASK
+    ROW_OF = ROW_OF
+    COL_OF = COL_OF
+    BOX_OF = BOX_OF
+    UNITS = UNITS
+    DIGIT_OF_BIT = DIGIT_OF_BIT
+
+    def __init__(self, cells, rows, cols, boxes):
+        self.cells = cells
+        self.rows = rows
+        self.cols = cols
+        self.boxes = boxes
+
+    @classmethod
+    def from_grid(cls, grid):
+        """Builds a state from a square grid, or returns None if the givens conflict"""
+        size = len(grid)
+        cls = state_class(size)
+        state = cls([0] * (size * size), [0] * size, [0] * size, [0] * size)
+
+        for row in range(size):
+            for col in range(size):
+                value = grid[row][col]
+
+                # Notes (str), wrong entries (negative) and blanks all count as empty
+                if isinstance(value, int) and value > 0:
+                    index = row * size + col
+                    bit = 1 << (value - 1)
+                    if not state.candidates(index) & bit:
+                        return None
+                    state.place(index, bit)
+
+        return state
+
+    def copy(self):
+        return type(self)(self.cells[:], self.rows[:], self.cols[:], self.boxes[:])
+
+    def candidates(self, index):
+        """Returns the bitmask of digits that can legally go in an empty cell"""
+        return self.FULL_MASK & ~(
+            self.rows[self.ROW_OF[index]] | self.cols[self.COL_OF[index]] | self.boxes[self.BOX_OF[index]]
+        )
+
+    def place(self, index, bit):
+        """Writes a digit (given as its bit) into a cell and updates the unit masks"""
+        self.cells[index] = self.DIGIT_OF_BIT[bit]
+        self.rows[self.ROW_OF[index]] |= bit
+        self.cols[self.COL_OF[index]] |= bit
+        self.boxes[self.BOX_OF[index]] |= bit
+
+    def to_grid(self):
+        cells, size = self.cells, self.SIZE
+        return [cells[row * size:row * size + size] for row in range(size)]
+
+
+@functools.lru_cache(maxsize=None)
+def state_class(size):
+    """Returns the SolverState class for a board size"""
+    if size == 9:
+        return SolverState
+
+    shape = geometry(size)
+    return type(f"SolverState{size}", (SolverState,), {
+        "__slots__": (),
+        "SIZE": size,
+        "CELLS": shape.cells,
+        "FULL_MASK": shape.full_mask,
+        "ROW_OF": shape.row_of,
+        "COL_OF": shape.col_of,
+        "BOX_OF": shape.box_of,
+        "UNITS": shape.units,
+        "DIGIT_OF_BIT": shape.digit_of_bit,
+    })
+
+
+def propagate(state):
+    """Applies naked and hidden singles until nothing changes. Returns False on a contradiction"""
+    cells = state.cells
+    candidates = state.candidates
+    full_mask = state.FULL_MASK
+
+    # The scans below inline candidates with local lookups; the unit masks are updated in place
+    rows, cols, boxes = state.rows, state.cols, state.boxes
+    row_of, col_of, box_of = state.ROW_OF, state.COL_OF, state.BOX_OF
+
+    progress = True
+    while progress:
+        progress = False
+
+        # Naked singles: empty cells left with exactly one candidate
+        for index in range(state.CELLS):
+            if cells[index]:
+                continue
+            mask = full_mask & ~(rows[row_of[index]] | cols[col_of[index]] | boxes[box_of[index]])
+            if not mask:
+                return False
+            if not mask & (mask - 1):
+                state.place(index, mask)
+                progress = True
+
+        if progress:
+            continue
+
+        # Hidden singles: digits that fit in only one cell of a unit
+        for unit in state.UNITS:
+            placed = seen_once = seen_twice = 0
+            for index in unit:
+                if cells[index]:
+                    placed |= 1 << (cells[index] - 1)
+                else:
+                    mask = full_mask & ~(rows[row_of[index]] | cols[col_of[index]] | boxes[box_of[index]])
+                    seen_twice |= seen_once & mask
+                    seen_once |= mask
+
+            # Some digit has nowhere left to go in this unit
+            if (seen_once | placed) != full_mask:
+                return False
+
+            hidden = seen_once & ~seen_twice
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for index in unit:
+                    if not cells[index] and candidates(index) & bit:
+                        state.place(index, bit)
+                        progress = True
+                        break
+                else:
+                    # An earlier hidden single in this unit took the only cell for this digit
+                    return False
+
+    return True
+
+
+def select_cell(state):
+    """Picks the empty cell with the fewest candidates (MRV). Returns (-1, 0) if the grid is full"""
+    cells = state.cells
+    candidates = state.candidates
+    best_index, best_mask, best_count = -1, 0, state.SIZE + 1
+
+    for index in range(state.CELLS):
+        if cells[index]:
+            continue
+        mask = candidates(index)
+        count = mask.bit_count()
+        if count < best_count:
+            best_index, best_mask, best_count = index, mask, count
+            if count <= 2:  # Propagation already removed every single, so 2 is the floor
+                break
+
+    return best_index, best_mask
+
+
+def split_bits(mask):
+    """Splits a candidate mask into its single-digit bits, lowest digit first"""
+    bits = []
+    while mask:
+        bit = mask & -mask
+        bits.append(bit)
+        mask ^= bit
+    return bits
+
+
+def search(state, rng=None):
+    """Depth-first search with propagation at every node. Returns the first solved state or None
+
+    Digits are tried in ascending order, or in a shuffled order when an rng is given.
+    """
+    stack = [state]
+    solved = None
+    nodes = dead_ends = 0
+
+    while stack:
+        current = stack.pop()
+        nodes += 1
+        if not propagate(current):
+            dead_ends += 1
+            continue
+
+        index, mask = select_cell(current)
+        if index < 0:
+            solved = current
+            break
+
+        bits = split_bits(mask)
+        if rng is not None:
+            rng.shuffle(bits)
+
+        # Push in reverse so the first digit in the order is explored first
+        for bit in reversed(bits):
+            child = current.copy()
+            child.place(index, bit)
+            stack.append(child)
+
+    if instruments.enabled:
+        report_search(nodes, dead_ends)
+    return solved
+
+
+def report_search(nodes, dead_ends):
+    """Adds one search's node expansions and backtracks (contradicted nodes) to the instruments"""
+    instruments.count("solver.searches")
+    instruments.count("solver.nodes", nodes)
+    instruments.count("solver.backtracks", dead_ends)
+
+
+def count_solutions(state, limit=2):
+    """Counts solutions of a state, stopping as soon as the limit is reached
+
+    Solved states are only counted, never stored, so a search for a second solution
+    costs no more memory than the search for the first. The given state is consumed.
+    """
+    count = 0
+    stack = [state]
+    nodes = dead_ends = 0
+
+    while stack:
+        current = stack.pop()
+        nodes += 1
+        if not propagate(current):
+            dead_ends += 1
+            continue
+
+        index, mask = select_cell(current)
+        if index < 0:
+            count += 1
+            if count >= limit:
+                break
+            continue
+
+        # The last candidate reuses the current state instead of copying it
+        bits = split_bits(mask)
+        for bit in bits[:-1]:
+            child = current.copy()
+            child.place(index, bit)
+            stack.append(child)
+        current.place(index, bits[-1])
+        stack.append(current)
+
+    if instruments.enabled:
+        report_search(nodes, dead_ends)
+    return count
+
+
+def has_other_solution(state, index, bit):
+    """Returns True if the state has a solution with a digit other than bit in an empty cell
+
+    This is the uniqueness test for removing a cell whose digit is known to solve the rest:
+    it needs a single solution rather than two, and never searches the branch holding the
+    known one. The given state is not modified.
+    """
+    for other in split_bits(state.candidates(index) & ~bit):
+        child = state.copy()
+        child.place(index, other)
+        if search(child) is not None:
+            return True
+    return False
+
+
+def solve_grid(grid, rng=None):
+    """Returns a solved copy of the grid as a list of rows, or None if it has no solution"""
+    state = SolverState.from_grid(grid)
+    if state is None:
+        return None
+
+    solved = search(state, rng)
+    return solved.to_grid() if solved else None
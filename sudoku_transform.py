@@ -0,0 +1,147 @@
+"""Validity- and rating-preserving puzzle transforms for cheap variety from a few rated seeds
+
+Usage: python sudoku_transform.py [--rounds N] [--seeds N]   (checks the transforms, then times them)
+"""
+import argparse
+import random
+import time
+from itertools import permutations, product
+from operator import itemgetter
+
+from sudoku_rating import rate_puzzle
+
+
+def flatten(grid):
+    return bytes(value for row in grid for value in row)
+
+
+def to_grid(values):
+    return [list(values[row * 9:row * 9 + 9]) for row in range(9)]
+
+
+# Every order of the nine rows (or columns) that keeps bands (or stacks) together: a band
+# permutation followed by a permutation inside each band, 6 ** 4 = 1296 in all
+_ORDERS = [
+    tuple(band * 3 + line for band, lines in zip(bands, inner) for line in lines)
+    for bands in permutations(range(3))
+    for inner in product(permutations(range(3)), repeat=3)
+]
+_DIGITS = range(1, 10)
+
+
+def random_transform(rng=random):
+    """Returns a random (cells, digit_table) pair for apply_transform
+
+    Combines a band permutation, row permutations within each band, the same for stacks
+    and columns, an optional transposition and a digit relabelling. Each of these maps
+    rows, columns and boxes onto rows, columns and boxes, so validity, uniqueness and the
+    techniques a solver needs are all unchanged.
+    """
+    rows = _ORDERS[rng.randrange(1296)]
+    cols = _ORDERS[rng.randrange(1296)]
+
+    if rng.getrandbits(1):
+        cell_map = [row + col * 9 for row in rows for col in cols]
+    else:
+        cell_map = [row * 9 + col for row in rows for col in cols]
+
+    # Empty cells (0) keep their value; digits 1 to 9 are relabelled
+    digit_table = bytes([0, *rng.sample(_DIGITS, 9)]) + bytes(246)
+    return itemgetter(*cell_map), digit_table
+
+
+def apply_transform(values, cells, digit_table):
+    """Applies a transform to 81 flat cell values, returning new bytes"""
+    return bytes(cells(values)).translate(digit_table)
+
+
+def transform_pair(puzzle, solution, rng=random):
+    """Returns a randomly transformed copy of a flat (puzzle, solution) pair"""
+    cells, digit_table = random_transform(rng)
+    return apply_transform(puzzle, cells, digit_table), apply_transform(solution, cells, digit_table)
+
+
+class SeedBank:
+    """Rated seed puzzles per difficulty as flat (puzzle, solution, rating) tuples
+
+    A difficulty without seeds is filled with seeds_per_difficulty freshly generated rated
+    puzzles the first time it is asked for; add puts in seeds from elsewhere, e.g. a PuzzleBank.
+    """
+
+    def __init__(self, seeds_per_difficulty=4):
+        self.seeds_per_difficulty = seeds_per_difficulty
+        self.seeds = {}
+
+    def add(self, difficulty, puzzle, solution, rating=None):
+        """Adds a 9x9 seed puzzle and its solution, rating it unless the rating is known"""
+        if rating is None:
+            rating = rate_puzzle(puzzle)
+        self.seeds.setdefault(difficulty, []).append((flatten(puzzle), flatten(solution), rating))
+
+    def get(self, difficulty, rng=random):
+        """Returns a random (puzzle, solution, rating) seed of a difficulty
+
+        Missing seeds are generated from rng too, so a seeded rng reproduces the whole draw.
+        """
+        if not self.seeds.get(difficulty):
+            from sudoku_game_logic import SudokuGame
+
+            for _ in range(self.seeds_per_difficulty):
+                game = SudokuGame(rng=rng)
+                game.generate_puzzle(difficulty)
+                self.add(difficulty, game.grid, game.solutions[0], game.rating)
+
+        return rng.choice(self.seeds[difficulty])
+
+
+# Seeds shared by every SudokuGame that does not bring its own bank
+shared_seed_bank = SeedBank()
+
+
+def verify_transforms(seed_bank, difficulties, rounds, rng=random):
+    """Checks that transformed seeds keep a unique solution, their solution and their rating
+
+    Raises AssertionError on the first transform that breaks one of them.
+    """
+    from sudoku_game_logic import SudokuGame
+
+    for difficulty in difficulties:
+        for puzzle, solution, rating in seed_bank.seeds.get(difficulty, ()):
+            for _ in range(rounds):
+                new_puzzle, new_solution = transform_pair(puzzle, solution, rng)
+                grid = to_grid(new_puzzle)
+
+                assert SudokuGame.count_solutions(grid) == 1, "transformed puzzle is not unique"
+                assert SudokuGame.count_solutions(to_grid(new_solution)) == 1, "transformed solution is invalid"
+                assert all(value in (0, digit) for value, digit in zip(new_puzzle, new_solution)), \
+                    "transformed puzzle disagrees with its solution"
+                assert rate_puzzle(grid) == rating, "transform changed the rating"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50, help="transforms checked per seed")
+    parser.add_argument("--seeds", type=int, default=3, help="seeds per difficulty")
+    parser.add_argument("--seed", type=int, default=2024, help="random seed")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    difficulties = ("Easy", "Medium", "Expert")
+    seed_bank = SeedBank(seeds_per_difficulty=args.seeds)
+    for difficulty in difficulties:
+        seed_bank.get(difficulty, rng)
+
+    verify_transforms(seed_bank, difficulties, args.rounds, rng)
+    print(f"{args.rounds * args.seeds * len(difficulties)} transforms kept uniqueness and rating")
+
+    puzzle, solution, _ = seed_bank.get("Expert", rng)
+    count = 100000
+    start = time.perf_counter()
+    for _ in range(count):
+        transform_pair(puzzle, solution, rng)
+    elapsed = time.perf_counter() - start
+    print(f"{count / elapsed:,.0f} transformed puzzles/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Vectorized batch solver for bulk puzzle validation; needs NumPy, which the game itself does not
+
+Usage: python sudoku_vector_solver.py [--count N] [--seed S]   (times it against SudokuGame.solve_sudoku)
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+import sudoku_solver
+from sudoku_solver import UNITS, SolverState, select_cell, split_bits
+
+UNIT_CELLS = np.array(UNITS, dtype=np.intp)  # (27, 9): rows, then columns, then boxes
+
+# The row, column and box unit numbers of each cell, (81, 3)
+CELL_UNITS = np.array(
+    [[unit for unit, cells in enumerate(UNITS) if index in cells] for index in range(81)], dtype=np.intp
+)
+
+DIGITS = np.arange(1, 10, dtype=np.uint8)
+
+
+def propagate(filled):
+    """Applies naked and hidden singles to a batch until none of its puzzles changes
+
+    filled is an (N, 81, 9) bool one-hot array of placed digits, updated in place. Returns an
+    (N,) bool array marking the puzzles that reached a contradiction.
+    """
+    count = len(filled)
+    broken = np.zeros(count, dtype=bool)
+    active = np.arange(count)
+
+    while len(active):
+        current = filled[active]
+        empty = ~current.any(axis=2)
+
+        # A digit used in any of a cell's three units is ruled out for it
+        used_count = current[:, UNIT_CELLS].sum(axis=2)  # (n, 27, 9)
+        used = used_count > 0
+        candidates = empty[:, :, None] & ~used[:, CELL_UNITS].any(axis=2)
+
+        unit_candidates = candidates[:, UNIT_CELLS]  # (n, 27, 9 cells, 9 digits)
+        places = unit_candidates.sum(axis=2)
+
+        stuck = (
+            (used_count > 1).any(axis=(1, 2))  # a digit repeated in a unit
+            | (empty & ~candidates.any(axis=2)).any(axis=1)  # an empty cell with no candidate
+            | (~used & (places == 0)).any(axis=(1, 2))  # a missing digit with nowhere to go
+        )
+
+        # Naked singles, then hidden singles mapped back from unit order to cell order
+        placing = candidates & (candidates.sum(axis=2) == 1)[:, :, None]
+        hidden = unit_candidates & (places == 1)[:, :, None, :]
+        for group in range(3):
+            units = slice(9 * group, 9 * group + 9)
+            placing[:, UNIT_CELLS[units].ravel()] |= hidden[:, units].reshape(-1, 81, 9)
+
+        # Two digits forced into one cell is a contradiction too
+        stuck |= (placing.sum(axis=2) > 1).any(axis=1)
+        progress = placing.any(axis=(1, 2)) & ~stuck
+
+        broken[active[stuck]] = True
+        filled[active[progress]] = current[progress] | placing[progress]
+        active = active[progress]
+
+    return broken
+
+
+def solve_and_count(state):
+    """Searches a state for up to two solutions. Returns (first solution's cells or None, count)
+
+    One pass replaces a search followed by count_solutions; the state is consumed.
+    """
+    first = None
+    count = 0
+    stack = [state]
+
+    while stack:
+        current = stack.pop()
+        if not sudoku_solver.propagate(current):
+            continue
+
+        index, mask = select_cell(current)
+        if index < 0:
+            count += 1
+            if first is None:
+                first = current.cells
+            if count == 2:
+                break
+            continue
+
+        bits = split_bits(mask)
+        for bit in bits[:-1]:
+            child = current.copy()
+            child.place(index, bit)
+            stack.append(child)
+        current.place(index, bits[-1])
+        stack.append(current)
+
+    return first, count
+
+
+def solve_batch(grids):
+    """Solves an (N, 9, 9) uint8 array of puzzles, 0 marking empty cells
+
+    Returns (solutions, unique): an (N, 9, 9) uint8 array holding each puzzle's solution,
+    all zeros for a puzzle without one, and an (N,) bool array that is True where the
+    solution is the only one. Singles propagation runs across the whole batch; only the
+    puzzles it leaves unfinished are searched one at a time.
+    """
+    values = np.asarray(grids, dtype=np.uint8).reshape(-1, 81)
+    filled = values[:, :, None] == DIGITS
+
+    # Givens that already clash are caught by the first propagation pass
+    broken = propagate(filled)
+
+    solutions = np.where(filled.any(axis=2), filled.argmax(axis=2) + 1, 0).astype(np.uint8)
+    solutions[broken] = 0
+    unique = ~broken
+
+    # Singles are forced moves, so a puzzle they finish has exactly one solution
+    for index in np.flatnonzero(~broken & (solutions == 0).any(axis=1)):
+        state = SolverState.from_grid(solutions[index].reshape(9, 9).tolist())
+        cells, count = solve_and_count(state)
+        solutions[index] = cells or 0
+        unique[index] = count == 1
+
+    return solutions.reshape(-1, 9, 9), unique
+
+
+def main(argv=None):
+    from sudoku_game_logic import SudokuGame
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000, help="puzzles per difficulty")
+    parser.add_argument("--seed", type=int, default=2024, help="random seed")
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    print(f"{'difficulty':<10} {'scalar/sec':>11} {'batch/sec':>11} {'speedup':>9} {'unique':>8}")
+
+    for difficulty in ("Easy", "Medium", "Expert"):
+        # Transformed seeds give many distinct rated puzzles without a long generation run
+        game = SudokuGame(generation_mode="transform")
+        puzzles = np.array([game.generate_puzzle(difficulty) for _ in range(args.count)], dtype=np.uint8)
+
+        # The scalar path: solve_sudoku plus a uniqueness count, one nested list at a time
+        start = time.perf_counter()
+        for puzzle in puzzles.tolist():
+            SudokuGame().solve_sudoku([row[:] for row in puzzle])
+            SudokuGame.count_solutions(puzzle)
+        scalar = time.perf_counter() - start
+
+        start = time.perf_counter()
+        solutions, unique = solve_batch(puzzles)
+        batch = time.perf_counter() - start
+
+        assert ((puzzles == 0) | (puzzles == solutions)).all()
+        print(f"{difficulty:<10} {args.count / scalar:>11.0f} {args.count / batch:>11.0f} "
+              f"{scalar / batch:>8.1f}x {unique.sum():>8}")
+
+
+if __name__ == "__main__":
+    main()
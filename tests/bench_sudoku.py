@@ -0,0 +1,66 @@
+"""pytest-benchmark suite over the fixed-seed corpora of sudoku_benchmark
+
+Usage: pytest tests/bench_sudoku.py --benchmark-save=baseline
+       pytest tests/bench_sudoku.py --benchmark-compare --benchmark-compare-fail=mean:25%
+
+Every run generates the same puzzles, so saved runs compare like for like on one machine.
+"""
+import random
+
+import pytest
+
+from sudoku_benchmark import DIFFICULTIES, corpus_digest, time_generation, time_rendering, time_solving
+from sudoku_game_logic import SudokuGame
+
+pytest.importorskip("pytest_benchmark")
+
+SEED = 2024
+ROUNDS = 5
+FRAMES = 20
+
+
+@pytest.fixture(scope="module")
+def corpora():
+    return {difficulty: time_generation(SudokuGame, difficulty, ROUNDS, SEED)[1] for difficulty in DIFFICULTIES}
+
+
+@pytest.fixture(scope="module")
+def renderers():
+    random.seed(SEED)
+    game = SudokuGame()
+    game.generate_puzzle("Medium")
+    renderers, ui = time_rendering(game.grid, game.solutions[0], FRAMES)
+    yield renderers
+    ui.puzzle_pool.close()
+
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_generate(benchmark, corpora, difficulty):
+    benchmark.extra_info["corpus"] = corpus_digest(corpora)
+    _, puzzles = benchmark.pedantic(time_generation, args=(SudokuGame, difficulty, ROUNDS, SEED), rounds=3)
+    assert puzzles == corpora[difficulty]
+
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_solve(benchmark, corpora, difficulty):
+    benchmark.extra_info["corpus"] = corpus_digest(corpora)
+    benchmark(time_solving, SudokuGame, corpora[difficulty])
+
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_unique(benchmark, corpora, difficulty):
+    benchmark.extra_info["corpus"] = corpus_digest(corpora)
+    counts = benchmark(lambda: [SudokuGame.count_solutions(puzzle) for puzzle in corpora[difficulty]])
+    assert counts == [1] * ROUNDS
+
+
+def test_is_valid_move(benchmark, corpora):
+    benchmark.extra_info["corpus"] = corpus_digest(corpora)
+    moves = [(puzzle, row, col, num) for puzzle in corpora["Medium"]
+             for row in range(9) for col in range(9) for num in range(1, 10)]
+    benchmark(lambda: [SudokuGame.is_valid_move(*move) for move in moves])
+
+
+@pytest.mark.parametrize("frame", ("idle", "edit", "cold"))
+def test_draw_grid(benchmark, renderers, frame):
+    benchmark(renderers[f"draw_grid.{frame}"])
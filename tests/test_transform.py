@@ -0,0 +1,73 @@
+import random
+
+import pytest
+
+from sudoku_game_logic import SudokuGame
+from sudoku_rating import rate_puzzle
+from sudoku_solver import solve_grid
+from sudoku_transform import SeedBank, to_grid, transform_pair, verify_transforms
+
+DIFFICULTIES = ("Easy", "Medium", "Expert")
+ROUNDS = 20
+
+
+@pytest.fixture(scope="module")
+def seed_bank():
+    seed_bank = SeedBank()
+    for difficulty in DIFFICULTIES:
+        for index in range(2):
+            game = SudokuGame(rng=random.Random(f"test-transform/{difficulty}/{index}"))
+            game.generate_puzzle(difficulty)
+            seed_bank.add(difficulty, game.grid, game.solutions[0], game.rating)
+    return seed_bank
+
+
+@pytest.mark.parametrize("difficulty", DIFFICULTIES)
+def test_transforms_keep_uniqueness_solution_and_rating(seed_bank, difficulty):
+    rng = random.Random(2024)
+    for puzzle, solution, rating in seed_bank.seeds[difficulty]:
+        for _ in range(ROUNDS):
+            new_puzzle, new_solution = transform_pair(puzzle, solution, rng)
+            grid = to_grid(new_puzzle)
+
+            assert SudokuGame.count_solutions(grid) == 1
+            assert solve_grid(grid) == to_grid(new_solution)
+            assert rate_puzzle(grid) == rating
+
+
+def test_verify_transforms_accepts_seeded_transforms(seed_bank):
+    verify_transforms(seed_bank, DIFFICULTIES, 5, random.Random(7))
+
+
+def test_transform_generation_is_reproducible(seed_bank):
+    def generate():
+        game = SudokuGame(generation_mode="transform", seed_bank=seed_bank, rng=random.Random(11))
+        game.generate_puzzle("Expert")
+        return game.grid, game.solutions[0], game.rating
+
+    puzzle, solution, rating = generate()
+    assert generate() == (puzzle, solution, rating)
+    assert rating == rate_puzzle(puzzle)
+    assert all(value in (0, digit) for puzzle_row, solution_row in zip(puzzle, solution)
+               for value, digit in zip(puzzle_row, solution_row))
+
+
+def test_empty_seed_bank_is_filled_from_the_given_rng():
+    def generate():
+        game = SudokuGame(generation_mode="transform", seed_bank=SeedBank(seeds_per_difficulty=1), rng=random.Random(3))
+        game.generate_puzzle("Easy")
+        return game.grid
+
+    random.seed(1)
+    first = generate()
+    random.seed(2)
+    assert generate() == first
+
+
+def test_seed_bank_keeps_a_zero_rating(seed_bank, monkeypatch):
+    puzzle, solution, _ = seed_bank.seeds["Easy"][0]
+    monkeypatch.setattr("sudoku_transform.rate_puzzle", pytest.fail)
+
+    bank = SeedBank()
+    bank.add("Easy", to_grid(puzzle), to_grid(solution), 0)
+    assert bank.seeds["Easy"][0][2] == 0